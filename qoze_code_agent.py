@@ -48,7 +48,7 @@ from tools.file_tools import read_file, list_files, search_in_files, list_dir, g
     find_files
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '.qoze'))
-from tools.search_tool import tavily_search, read_url
+from tools.search_tool import tavily_search, read_url, aclose_http_client
 # from tools.browser_tool import browser_navigate, browser_click, browser_type, browser_read_page, \
 #     browser_get_html, browser_scroll, browser_open_tab, browser_switch_tab, browser_list_tabs, \
 #     browser_press_key, browser_send_keys, browser_hotkey, browser_focus, \
@@ -65,7 +65,7 @@ from qoze_mcp.mcp_manager import MCPManager
 from utils.directory_tree import get_directory_tree
 from utils.island_reporter import report_state as island_report
 from utils.git_context import get_git_context
-from utils.system_prompt import get_static_system_prompt, get_dynamic_context, load_memory_context
+from utils.system_prompt import get_static_system_prompt, get_dynamic_context, load_memory_context, load_qoze_rules
 
 os.environ.setdefault('ABSL_LOGGING_VERBOSITY', '1')  # 只显示 WARNING 及以上级别
 os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')  # 屏蔽 TensorFlow 信息和警告
@@ -79,42 +79,6 @@ skill_manager = None
 mcp_manager = None
 
 
-def load_qoze_rules(current_dir):
-    """
-    加载 .qoze/rules 目录下的自定义规则文件
-    
-    Args:
-        current_dir: 当前工作目录
-        
-    Returns:
-        str: 格式化的规则内容，如果没有规则则返回空字符串
-    """
-    rules_dir = os.path.join(current_dir, '.qoze', 'rules')
-    rules_prompt = ''
-
-    if os.path.exists(rules_dir) and os.path.isdir(rules_dir):
-        try:
-            # 获取目录中的所有文件
-            rule_files = [f for f in os.listdir(rules_dir) if os.path.isfile(os.path.join(rules_dir, f))]
-
-            if rule_files:
-                rules_prompt += "## 当前自定义 agent 规则\n"
-                for file_name in sorted(rule_files):  # 按文件名排序
-                    file_path = os.path.join(rules_dir, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            file_content = f.read()
-                        rules_prompt += f"### {file_name}\n{file_content}\n"
-                    except Exception:
-                        pass  # 静默处理单个文件读取错误
-                rules_prompt += "\n"
-
-        except Exception:
-            pass  # 静默处理目录读取错误
-
-    return rules_prompt
-
-
 def get_context_info(system_info="", system_release="", system_version="", machine_type="", processor="",
                      shell="", current_dir="", directory_tree="", model_name="", model_supports_vision=True,
                      git_context=""):
@@ -517,6 +481,7 @@ _ASYNC_TOOL_NAMES = {
     "browser_network_get", "dispatch_subagent",
     "transcribe_audio",
     "list_mcp_servers", "activate_mcp_server", "deactivate_mcp_server",
+    "activate_skill", "deactivate_skill",
 }
 
 
@@ -550,7 +515,9 @@ async def tool_node(state: dict):
             console.print(error_msg, style="red")
             return ToolMessage(content=error_msg, tool_call_id=tc["id"], name=tool_name)
         except Exception as e:
-            traceback.print_exc()
+            # 堆栈经 console 输出：TUI 模式下直写 stderr 会破坏界面，且 console 为 quiet 时跳过格式化
+            if not console.quiet:
+                console.print(traceback.format_exc(), style="dim red", markup=False, highlight=False)
             error_msg = f"❌ '{tool_name}' 调用失败: {type(e).__name__}: {e}"
             console.print(error_msg, style="red")
             return ToolMessage(content=error_msg, tool_call_id=tc["id"], name=tool_name)
@@ -632,8 +599,17 @@ async def init_agent():
 
 
 async def shutdown_agent():
-    """关闭 agent 的 SQLite 连接，确保进程能正常退出。"""
+    """关闭 MCP 服务、共享的 HTTP 客户端和 agent 的 SQLite 连接，确保进程能正常退出。"""
     global _sqlite_conn, agent
+    if mcp_manager is not None:
+        try:
+            await mcp_manager.shutdown()
+        except Exception:
+            pass
+    try:
+        await aclose_http_client()
+    except Exception:
+        pass
     if _sqlite_conn is not None:
         # 强制将 WAL 内容写回主数据库，防止数据丢失
         try:
@@ -4,12 +4,18 @@
 MCP 客户端封装 - 管理 MultiServerMCPClient 的连接和工具加载
 """
 import os
+import json
+import hashlib
+import time
 import asyncio
+import contextlib
 from typing import Dict, List, Optional
 from pathlib import Path
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
 from langchain_core.tools import BaseTool
+from mcp.types import Tool as MCPTool
 from shared_console import console, is_tui_mode
 
 
@@ -22,6 +28,14 @@ _SILENCE_ENV = {
     "npm_config_update_notifier": "false",
 }
 
+# 各服务工具定义的磁盘缓存：启动时按服务配置指纹命中则直接构建工具，省去握手与 list_tools
+_TOOLS_CACHE_FILE = Path.home() / ".qoze" / "mcp_tools_cache.json"
+_DEFAULT_TOOLS_CACHE_TTL = 24 * 3600
+
+# _silence_stderr_in_tui 的嵌套计数：并发的连接任务共用一次重定向，最后一个退出时才恢复
+_stderr_silence_depth = 0
+_saved_stderr_fd = None
+
 
 class MCPClientWrapper:
     """MCP 客户端封装，管理 MultiServerMCPClient 的连接和工具加载"""
@@ -31,6 +45,7 @@ class MCPClientWrapper:
         self._server_configs: Dict[str, dict] = {}
         self._settings = settings or {}
         self._connection_timeout = self._settings.get("connection_timeout", 30)
+        self._tools_cache_ttl = self._settings.get("tools_cache_ttl", _DEFAULT_TOOLS_CACHE_TTL)
 
     def _build_server_config(self, config) -> dict:
         """将 MCPServerConfig 转换为 MultiServerMCPClient 需要的字典格式"""
@@ -61,6 +76,53 @@ class MCPClientWrapper:
 
         return server_config
 
+    def _build_client_config(self, servers: dict, record: bool = True) -> Dict[str, dict]:
+        """构建 MultiServerMCPClient 配置；record 为 True 时合并记录为当前连接的服务
+
+        只合并不重置：启动时部分服务由缓存恢复、其余再连接，已记录的服务不能被覆盖掉。
+        """
+        client_config = {}
+
+        for name, config in servers.items():
+            server_cfg = self._build_server_config(config)
+            if server_cfg:
+                client_config[name] = server_cfg
+                if record:
+                    self._server_configs[name] = server_cfg
+
+        return client_config
+
+    def _rebuild_client(self):
+        """按当前记录的全部服务重建客户端，没有服务时置空"""
+        self._client = MultiServerMCPClient(dict(self._server_configs)) if self._server_configs else None
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _silence_stderr_in_tui():
+        """TUI 模式下临时重定向 stderr，防止子进程输出破坏界面
+
+        可被并发的连接任务交错进入：只有第一个进入者保存并重定向，最后一个退出者恢复。
+        """
+        global _stderr_silence_depth, _saved_stderr_fd
+        silenced = is_tui_mode()
+        if silenced:
+            if _stderr_silence_depth == 0:
+                _saved_stderr_fd = os.dup(2)
+                _null_fd = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(_null_fd, 2)
+                os.close(_null_fd)
+            _stderr_silence_depth += 1
+        try:
+            yield
+        finally:
+            if silenced:
+                _stderr_silence_depth -= 1
+                if _stderr_silence_depth == 0:
+                    # 恢复 stderr
+                    os.dup2(_saved_stderr_fd, 2)
+                    os.close(_saved_stderr_fd)
+                    _saved_stderr_fd = None
+
     async def connect_all(self, servers: dict) -> List[BaseTool]:
         """一次性连接所有指定的 MCP 服务并加载工具
 
@@ -76,56 +138,205 @@ class MCPClientWrapper:
         if not servers:
             return []
 
-        self._server_configs = {}
-        client_config = {}
-
-        for name, config in servers.items():
-            server_cfg = self._build_server_config(config)
-            if server_cfg:
-                client_config[name] = server_cfg
-                self._server_configs[name] = server_cfg
-
+        client_config = self._build_client_config(servers)
         if not client_config:
             return []
 
-        # TUI 模式下临时重定向 stderr，防止子进程输出破坏界面
-        _saved_stderr = None
-        _null_fd = None
-        if is_tui_mode():
-            _saved_stderr = os.dup(2)
-            _null_fd = os.open(os.devnull, os.O_WRONLY)
-            os.dup2(_null_fd, 2)
+        with self._silence_stderr_in_tui():
+            try:
+                # 只连接本次指定的服务，客户端则覆盖全部已记录的服务
+                client = MultiServerMCPClient(client_config)
+                self._rebuild_client()
+                tools = await asyncio.wait_for(
+                    client.get_tools(),
+                    timeout=self._connection_timeout
+                )
+                if not is_tui_mode():
+                    console.print(f"[green]MCP: {len(tools)} tools loaded from {len(client_config)} server(s)[/green]")
+                return list(tools) if tools else []
+            except asyncio.TimeoutError:
+                if not is_tui_mode():
+                    console.print(f"[red]MCP: Connection timeout ({self._connection_timeout}s)[/red]")
+                return []
+            except Exception as e:
+                if not is_tui_mode():
+                    console.print(f"[yellow]MCP: Failed to load tools: {e}[/yellow]")
+                return []
+
+    async def connect_each(self, servers: dict) -> Dict[str, List[BaseTool]]:
+        """连接指定的 MCP 服务，并发加载各服务的工具并按服务名分别返回
+
+        各服务的握手与 list_tools 同时进行，总耗时取决于最慢的服务而不是所有服务之和；
+        单个服务失败或超时只影响该服务（其工具列表为空）。加载成功的服务写入磁盘缓存。
+
+        Args:
+            servers: {server_name: MCPServerConfig} 字典
+
+        Returns:
+            {server_name: 工具列表}
+        """
+        if not servers:
+            return {}
+
+        client_config = self._build_client_config(servers)
+        if not client_config:
+            return {}
 
         try:
-            self._client = MultiServerMCPClient(client_config)
-            tools = await asyncio.wait_for(
-                self._client.get_tools(),
-                timeout=self._connection_timeout
-            )
-            if not is_tui_mode():
-                console.print(f"[green]MCP: {len(tools)} tools loaded from {len(client_config)} server(s)[/green]")
-            return list(tools) if tools else []
-        except asyncio.TimeoutError:
-            if not is_tui_mode():
-                console.print(f"[red]MCP: Connection timeout ({self._connection_timeout}s)[/red]")
-            return []
+            client = MultiServerMCPClient(client_config)
+            self._rebuild_client()
         except Exception as e:
             if not is_tui_mode():
                 console.print(f"[yellow]MCP: Failed to load tools: {e}[/yellow]")
-            return []
-        finally:
-            # 恢复 stderr
-            if _saved_stderr is not None:
-                os.dup2(_saved_stderr, 2)
-                os.close(_saved_stderr)
-            if _null_fd is not None:
-                os.close(_null_fd)
+            return {}
+        return await self._load_tools_by_server(client, client_config)
+
+    async def _load_tools_by_server(self, client: MultiServerMCPClient,
+                                    client_config: Dict[str, dict]) -> Dict[str, List[BaseTool]]:
+        with self._silence_stderr_in_tui():
+            results = await asyncio.gather(
+                *(asyncio.wait_for(client.get_tools(server_name=name), timeout=self._connection_timeout)
+                  for name in client_config),
+                return_exceptions=True
+            )
+
+        tools_by_server = {}
+        for name, result in zip(client_config, results):
+            if isinstance(result, asyncio.TimeoutError):
+                if not is_tui_mode():
+                    console.print(f"[red]MCP: {name}: Connection timeout ({self._connection_timeout}s)[/red]")
+                tools_by_server[name] = []
+            elif isinstance(result, BaseException):
+                if not is_tui_mode():
+                    console.print(f"[yellow]MCP: {name}: Failed to load tools: {result}[/yellow]")
+                tools_by_server[name] = []
+            else:
+                tools_by_server[name] = list(result) if result else []
+
+        self._save_tools_cache(client_config, tools_by_server)
+        return tools_by_server
+
+    # ─── 工具定义磁盘缓存 ─────────────────────────────────────
+
+    @staticmethod
+    def _fingerprint(server_cfg: dict) -> str:
+        # 只保存摘要，env/headers 中的密钥不会写入缓存文件
+        return hashlib.sha256(json.dumps(server_cfg, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _read_tools_cache() -> dict:
+        try:
+            with open(_TOOLS_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_tools_cache(self, client_config: Dict[str, dict], tools_by_server: Dict[str, List[BaseTool]]):
+        """记录加载成功的服务的工具定义（名称、描述、参数 schema）"""
+        if not self._tools_cache_ttl:
+            return
+        entries = {}
+        for name, tools in tools_by_server.items():
+            if not tools:
+                continue
+            try:
+                entry = {
+                    "fingerprint": self._fingerprint(client_config[name]),
+                    "saved_at": time.time(),
+                    "tools": [
+                        {
+                            "name": t.name,
+                            "description": t.description or "",
+                            "inputSchema": t.args_schema,
+                            "metadata": t.metadata,
+                        }
+                        for t in tools
+                    ],
+                }
+                json.dumps(entry)  # 不可序列化的定义（如非 dict 的 schema）不缓存
+            except Exception:
+                continue
+            entries[name] = entry
+        if not entries:
+            return
+        try:
+            cache = self._read_tools_cache()
+            cache.update(entries)
+            _TOOLS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(_TOOLS_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False)
+        except Exception:
+            pass
+
+    def load_cached_tools(self, servers: dict) -> Dict[str, List[BaseTool]]:
+        """从磁盘缓存构建工具，只返回配置指纹一致且未过期的服务
+
+        工具每次调用都会按连接配置新建会话，用缓存的定义构建即可直接调用，无需先连接服务。
+        缓存在 tools_cache_ttl（默认 24 小时）内有效，期间服务端新增/修改的工具不会体现，
+        直到后台刷新 (refresh_tools_cache) 写回缓存后的下一次启动；tools_cache_ttl 设为 0 可关闭缓存。
+        """
+        if not servers or not self._tools_cache_ttl:
+            return {}
+        cache = self._read_tools_cache()
+        if not cache:
+            return {}
+
+        now = time.time()
+        tools_by_server = {}
+        hit_configs = {}
+        for name, server_cfg in self._build_client_config(servers, record=False).items():
+            entry = cache.get(name)
+            if not isinstance(entry, dict):
+                continue
+            if entry.get("fingerprint") != self._fingerprint(server_cfg):
+                continue
+            if now - entry.get("saved_at", 0) > self._tools_cache_ttl:
+                continue
+            try:
+                tools = []
+                for t in entry["tools"]:
+                    tool = convert_mcp_tool_to_langchain_tool(
+                        None,
+                        MCPTool(name=t["name"], description=t.get("description") or "", inputSchema=t["inputSchema"]),
+                        connection=server_cfg,
+                        server_name=name,
+                    )
+                    if t.get("metadata"):
+                        tool.metadata = t["metadata"]
+                    tools.append(tool)
+            except Exception:
+                continue
+            tools_by_server[name] = tools
+            hit_configs[name] = server_cfg
+
+        if hit_configs:
+            # 命中缓存的服务同样视为已连接（工具调用时按配置建立会话）
+            self._server_configs.update(hit_configs)
+            self._rebuild_client()
+        return tools_by_server
+
+    async def refresh_tools_cache(self, servers: dict) -> Dict[str, List[BaseTool]]:
+        """重新从服务加载工具并更新磁盘缓存，不改变当前连接状态（供启动命中缓存后后台刷新）"""
+        client_config = self._build_client_config(servers, record=False)
+        if not client_config:
+            return {}
+        try:
+            client = MultiServerMCPClient(client_config)
+        except Exception:
+            return {}
+        return await self._load_tools_by_server(client, client_config)
 
     async def reconnect_all(self, servers: dict) -> List[BaseTool]:
         """重新连接所有服务（配置热加载后调用）"""
         await self.disconnect_all()
         return await self.connect_all(servers)
 
+    def disconnect(self, name: str):
+        """移除单个服务的连接记录，其余服务保持不变"""
+        if self._server_configs.pop(name, None) is not None:
+            self._rebuild_client()
+
     async def disconnect_all(self):
         """断开所有 MCP 连接"""
         if self._client:
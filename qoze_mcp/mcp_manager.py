@@ -6,6 +6,7 @@ MCP 服务管理器 - 对标 SkillManager 的管理模式
 """
 
 import json
+import asyncio
 from pathlib import Path
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
@@ -62,6 +63,7 @@ class MCPManager:
         self._config_file = Path.home() / ".qoze" / "mcp_config.json"
         self._settings: dict = {}
         self._auto_activated = False  # 是否已经自动激活过
+        self._cache_refresh_task: Optional[asyncio.Task] = None  # 启动命中工具缓存后的后台刷新
         self._load_config()
 
     # ─── 配置管理 ─────────────────────────────────────────
@@ -163,22 +165,32 @@ class MCPManager:
         if not is_tui_mode():
             console.print(f"[dim]MCP: Auto-activating {len(targets)} server(s): {', '.join(targets)}...[/dim]")
 
-        for name in targets:
+        # 尚未激活的服务一次性并发连接，而不是逐个 activate_server 串行等待各自的握手
+        pending = {name: self._servers[name] for name in targets if name not in self._active_servers}
+        if pending:
             try:
-                tools, msg = await self.activate_server(name)
-                if tools:
-                    all_tools.extend(tools)
-                    if not is_tui_mode():
-                        console.print(f"[green]  ✓ {name}: {len(tools)} tool(s)[/green]")
-                elif "ALREADY_ACTIVE" in msg:
-                    if not is_tui_mode():
-                        console.print(f"[dim]  {name}: already active[/dim]")
-                else:
-                    if not is_tui_mode():
-                        console.print(f"[yellow]  ⚠ {name}: {msg}[/yellow]")
+                loaded = await self._client_wrapper.connect_each(pending)
             except Exception as e:
+                loaded = {}
+                if not is_tui_mode():
+                    console.print(f"[red]  ✗ {', '.join(pending)}: {e}[/red]")
+            for name in pending:
+                self._loaded_tools[name] = loaded.get(name, [])
+                self._active_servers.append(name)
+            self._save_config()
+
+        for name in targets:
+            tools = self._loaded_tools.get(name, [])
+            if tools:
+                all_tools.extend(tools)
                 if not is_tui_mode():
-                    console.print(f"[red]  ✗ {name}: {e}[/red]")
+                    console.print(f"[green]  ✓ {name}: {len(tools)} tool(s)[/green]")
+            elif name not in pending:
+                if not is_tui_mode():
+                    console.print(f"[dim]  {name}: already active[/dim]")
+            else:
+                if not is_tui_mode():
+                    console.print(f"[yellow]  ⚠ {name}: 未加载到工具[/yellow]")
 
         return all_tools
 
@@ -273,29 +285,28 @@ class MCPManager:
         if name not in self._active_servers:
             return [], f"[MCP_NOT_ACTIVE] 服务 '{name}' 当前未激活"
 
+        await self._cancel_cache_refresh()
         removed_tools = self._loaded_tools.pop(name, [])
         self._active_servers.remove(name)
         self._save_config()
 
-        await self._client_wrapper.disconnect_all()
-
-        # 如果有其他激活服务，重新连接
+        # MCP 工具每次调用都会新建会话，不依赖客户端连接，其余服务已加载的工具对象可直接复用，
+        # 无需重新连接并重建全部工具 (list_tools + schema 构建)
         if self._active_servers:
-            active_configs = {
-                n: self._servers[n]
-                for n in self._active_servers
-                if n in self._servers
-            }
-            if active_configs:
-                self._loaded_tools = {}
-                await self._client_wrapper.connect_all(active_configs)
+            self._client_wrapper.disconnect(name)
+        else:
+            await self._client_wrapper.disconnect_all()
 
         if not is_tui_mode():
             console.print(f"[yellow]MCP: Deactivated '{name}'[/yellow]")
         return removed_tools, f"[MCP_DEACTIVATED] 服务 '{name}' 已反激活，卸载 {len(removed_tools)} 个工具"
 
     async def get_active_tools(self) -> List[BaseTool]:
-        """获取所有已激活服务的工具列表（启动时调用）"""
+        """获取所有已激活服务的工具列表（启动时调用）
+
+        命中磁盘缓存的服务直接使用缓存的工具定义（最多滞后 tools_cache_ttl，默认 24 小时），
+        同时在后台刷新缓存，刷新结果在下一次启动时生效。
+        """
         if not self._active_servers:
             return []
 
@@ -307,9 +318,17 @@ class MCPManager:
                 if n in self._servers
             }
             if active_configs:
-                tools = await self._client_wrapper.connect_all(active_configs)
-                # 缓存所有获取到的工具
-                self._loaded_tools['_all_connected_tools'] = tools
+                # 先用磁盘缓存的工具定义，省去启动时的握手与 list_tools；未命中的服务再并发连接
+                cached = self._client_wrapper.load_cached_tools(active_configs)
+                self._loaded_tools.update(cached)
+                missing = {n: c for n, c in active_configs.items() if n not in cached}
+                if missing:
+                    self._loaded_tools.update(await self._client_wrapper.connect_each(missing))
+                if cached:
+                    # 后台重新拉取命中缓存的服务，只更新缓存文件，下次启动生效
+                    self._cache_refresh_task = asyncio.create_task(
+                        self._client_wrapper.refresh_tools_cache({n: active_configs[n] for n in cached})
+                    )
 
         # 返回所有工具去重
         all_tools = []
@@ -323,8 +342,25 @@ class MCPManager:
 
     async def reload_config(self) -> tuple:
         """热加载配置文件，重新连接所有服务"""
+        await self._cancel_cache_refresh()
         self._loaded_tools.clear()
         self._active_servers.clear()
         self._load_config()
         tools = await self.auto_activate_all()
         return tools, "配置已重载"
+
+    async def shutdown(self) -> None:
+        """退出前停止后台缓存刷新并断开所有服务"""
+        await self._cancel_cache_refresh()
+        await self._client_wrapper.disconnect_all()
+
+    async def _cancel_cache_refresh(self) -> None:
+        """取消并等待启动时的后台缓存刷新，避免其在服务变更或退出后继续运行"""
+        task, self._cache_refresh_task = self._cache_refresh_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
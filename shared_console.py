@@ -28,6 +28,8 @@ def set_tui_mode(enabled: bool = True):
     避免破坏 Textual 界面渲染。"""
     global _tui_mode, _null_file
     _tui_mode = enabled
+    # quiet 让 Rich 直接丢弃缓冲区，省去 ANSI 编码与写文件的开销
+    console.quiet = enabled
     if enabled:
         if _null_file is None:
             _null_file = open(os.devnull, "w", encoding="utf-8")
@@ -7,43 +7,133 @@ QozeCode Skills Management System
 
 import os
 import json
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from shared_console import console
-from rich.panel import Panel
-from rich.table import Table
+
+# 常见的资源目录
+_RESOURCE_DIRS = ('scripts', 'templates', 'assets', 'references', 'examples')
+
+# 技能发现时并发读取 SKILL.md 的线程数上限
+_DISCOVER_WORKERS = 8
+
+_FRONTMATTER_DELIMITERS = (b'---\n', b'---\r\n')
+
+# frontmatter 中简单的单行 `key: value`
+_SIMPLE_FIELD_RE = re.compile(r'^([A-Za-z_][\w-]*):[ \t]*(.*?)[ \t]*$')
+
+
+def _decode(data: bytes) -> str:
+    # 与文本模式读取一致：按 UTF-8 解码并统一换行符
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _read_frontmatter(f) -> Optional[str]:
+    """从以二进制打开的文件开头读取 frontmatter 块，读到结束分隔符即停止；格式不符返回 None
+
+    首行最多读取 5 字节判断是否为 `---`，不是技能文件（例如误放的大文档）时不会读入整个文件。
+    """
+    if f.readline(5) not in _FRONTMATTER_DELIMITERS:
+        return None
+    lines = []
+    for line in f:
+        if line in _FRONTMATTER_DELIMITERS:
+            return _decode(b''.join(lines))
+        lines.append(line)
+    return None
+
+
+def _parse_frontmatter(text: str) -> dict:
+    """解析 frontmatter
+
+    常见的 SKILL.md 头部只有几行 `key: value`，直接按行拆分；
+    遇到列表、多行、嵌套或带特殊语法的值时交给 yaml 完整解析。
+    """
+    meta = {}
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        match = _SIMPLE_FIELD_RE.match(line)
+        if not match:
+            return _parse_frontmatter_yaml(text)
+        key, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            quote, value = value[0], value[1:-1]
+            # 转义与引号嵌套交给 yaml
+            if quote in value or '\\' in value:
+                return _parse_frontmatter_yaml(text)
+        elif not value or value[0] in '[{|>&*!%@`\'"-?' or ': ' in value or ' #' in value:
+            return _parse_frontmatter_yaml(text)
+        meta[key] = value
+    return meta
+
+
+def _parse_frontmatter_yaml(text: str):
+    import yaml
+    return yaml.safe_load(text)
+
+
+def _read_skill_body(skill_file_path: str) -> str:
+    """读取 SKILL.md 中 frontmatter 之后的正文"""
+    with open(skill_file_path, 'rb') as f:
+        if _read_frontmatter(f) is None:
+            return ""
+        return _decode(f.read()).strip()
 
 
 @dataclass
 class Skill:
-    """技能数据类"""
+    """技能数据类
+
+    发现阶段只解析 frontmatter，正文在首次访问 content 时才从 location 读取。
+    """
     name: str
     description: str
-    content: str
     location: str
     tier: str  # 'project', 'user', 'builtin'
     resources: List[str]  # 关联的资源文件/目录
     enabled: bool = True
+    _content: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = _read_skill_body(self.location)
+        return self._content
 
 
 class SkillManager:
     """技能管理器：发现、加载、管理技能"""
 
-    def __init__(self, config_manager=None):
+    def __init__(self, config_manager=None, discover: bool = True):
+        """discover=False 时只加载配置，技能列表留空，需要时调用 refresh_skills 再扫描"""
         self.config_manager = config_manager
         self.skills: Dict[str, Skill] = {}
         self.active_skills: List[str] = []
         self.disabled_skills: List[str] = []
+        # batch() 嵌套深度与期间是否有未写入的配置修改
+        self._batch_depth = 0
+        self._config_dirty = False
+        # get_active_skills_content 的结果，每轮对话都会请求；技能状态或列表变化时置空
+        self._active_content_cache: Optional[str] = None
+        # activate/deactivate 可能在多个工作线程中并发保存配置，序列化 快照+替换
+        self._save_lock = threading.Lock()
 
         # 技能发现路径（按优先级）
         self.skill_paths = self._get_skill_paths()
         self.config_file = Path.home() / ".qoze" / "skills_config.json"
+        # 已解析技能的索引：{SKILL.md 绝对路径: {mtime_ns, name, description}}，mtime 未变则不再解析
+        self.index_file = Path.home() / ".qoze" / "skills_index.json"
 
         self._load_config()
-        self._discover_skills()
+        if discover:
+            self._discover_skills()
 
     def _get_skill_paths(self) -> List[Tuple[str, str]]:
         """获取技能搜索路径，返回 (路径, 层级) 元组"""
@@ -81,65 +171,166 @@ class SkillManager:
         """保存技能配置"""
         try:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            config = {
-                'disabled_skills': self.disabled_skills,
-                'active_skills': self.active_skills
-            }
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with self._save_lock:
+                config = {
+                    'disabled_skills': list(self.disabled_skills),
+                    'active_skills': list(self.active_skills)
+                }
+                # 先写唯一的临时文件再替换，避免写入中途失败留下被截断的配置，也避免并发保存互相覆盖临时文件
+                fd, tmp_file = tempfile.mkstemp(dir=self.config_file.parent,
+                                                prefix=f".{self.config_file.name}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(config, f, indent=2, ensure_ascii=False)
+                    os.replace(tmp_file, self.config_file)
+                except BaseException:
+                    try:
+                        os.unlink(tmp_file)
+                    except OSError:
+                        pass
+                    raise
+                self._config_dirty = False
         except Exception as e:
             console.print(f"[red]Error saving skills config: {e}[/red]")
 
+    def _config_changed(self):
+        """记录配置修改；处于 batch() 中时延迟到退出时统一保存"""
+        self._active_content_cache = None
+        self._config_dirty = True
+        if not self._batch_depth:
+            self._save_config()
+
+    @contextmanager
+    def batch(self):
+        """批量修改技能状态，退出时只写一次配置
+
+        with skill_manager.batch():
+            for name in names:
+                skill_manager.disable_skill(name)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._config_dirty:
+                self._save_config()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_index(self, index: dict):
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+        except Exception:
+            pass
+
     def _discover_skills(self):
-        """发现所有可用技能"""
+        """发现所有可用技能
+
+        先按层级顺序扫描出全部 SKILL.md（只需 scandir + stat），
+        再用线程池并发读取各技能的 frontmatter 与资源，最后按层级顺序去重。
+        """
         self.skills.clear()
+        self._active_content_cache = None
+        index = self._load_index()
+        index_changed = False
 
+        # (索引键, SKILL.md 路径, 层级, mtime_ns, 索引中缓存的 (name, description))
+        candidates = []
         for skill_path, tier in self.skill_paths:
             if not os.path.exists(skill_path):
                 continue
 
-            for item in os.listdir(skill_path):
-                skill_dir = Path(skill_path) / item
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists():
-                        skill = self._load_skill(str(skill_file), tier)
-                        if skill and skill.name not in self.skills:
-                            self.skills[skill.name] = skill
-
-    def _load_skill(self, skill_file_path: str, tier: str) -> Optional[Skill]:
-        """加载单个技能文件"""
+            root = os.path.abspath(skill_path)
+            seen = set()
+            # DirEntry 自带类型信息，判断子目录无需再单独 stat；与原 Path.is_dir() 一致，跟随符号链接
+            with os.scandir(skill_path) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        continue
+                    skill_file = os.path.join(entry.path, "SKILL.md")
+                    try:
+                        mtime_ns = os.stat(skill_file).st_mtime_ns
+                    except OSError:
+                        continue
+
+                    key = os.path.join(root, entry.name, "SKILL.md")
+                    seen.add(key)
+                    cached = index.get(key)
+                    header = None
+                    if isinstance(cached, dict) and cached.get('mtime_ns') == mtime_ns and cached.get('name'):
+                        header = (cached['name'], cached.get('description', ''))
+                    candidates.append((key, skill_file, tier, mtime_ns, header))
+
+            # 清理该目录下已删除技能的索引项
+            for key in [k for k in index if os.path.dirname(os.path.dirname(k)) == root and k not in seen]:
+                del index[key]
+                index_changed = True
+
+        def load(candidate):
+            _, skill_file, tier, _, header = candidate
+            return self._load_skill(skill_file, tier, header)
+
+        if len(candidates) > 1:
+            with ThreadPoolExecutor(max_workers=min(_DISCOVER_WORKERS, len(candidates))) as executor:
+                loaded = list(executor.map(load, candidates))
+        else:
+            loaded = [load(c) for c in candidates]
+
+        for (key, _, _, mtime_ns, header), skill in zip(candidates, loaded):
+            if header is None:
+                if skill:
+                    index[key] = {'mtime_ns': mtime_ns, 'name': skill.name,
+                                  'description': skill.description}
+                    index_changed = True
+                elif key in index:
+                    del index[key]
+                    index_changed = True
+
+            # candidates 按层级优先级排列，同名技能保留先出现的
+            if skill and skill.name not in self.skills:
+                self.skills[skill.name] = skill
+
+        if index_changed:
+            self._save_index(index)
+
+    def _load_skill(self, skill_file_path: str, tier: str,
+                    header: Optional[Tuple[str, str]] = None) -> Optional[Skill]:
+        """加载单个技能文件；header 为索引中缓存的 (name, description) 时跳过 frontmatter 解析"""
         try:
-            with open(skill_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # 解析 frontmatter
-            if content.startswith('---\n'):
-                parts = content.split('---\n', 2)
-                if len(parts) >= 3:
-                    frontmatter = yaml.safe_load(parts[1])
-                    skill_content = parts[2].strip()
-                else:
+            if header is None:
+                # 只读取 frontmatter，正文按需加载
+                with open(skill_file_path, 'rb') as f:
+                    frontmatter_text = _read_frontmatter(f)
+                if frontmatter_text is None:
                     return None
-            else:
-                return None
+                frontmatter = _parse_frontmatter(frontmatter_text)
 
-            # 获取技能基本信息
-            name = frontmatter.get('name')
-            description = frontmatter.get('description', '')
+                # 获取技能基本信息
+                name = frontmatter.get('name')
+                description = frontmatter.get('description', '')
 
-            if not name:
-                console.print(f"[yellow]Warning: Skill {skill_file_path} missing name[/yellow]")
-                return None
+                if not name:
+                    console.print(f"[yellow]Warning: Skill {skill_file_path} missing name[/yellow]")
+                    return None
+            else:
+                name, description = header
 
             # 扫描关联资源
-            skill_dir = Path(skill_file_path).parent
+            skill_dir = os.path.dirname(skill_file_path)
             resources = self._scan_skill_resources(skill_dir)
 
             return Skill(
                 name=name,
                 description=description,
-                content=skill_content,
                 location=skill_file_path,
                 tier=tier,
                 resources=resources,
@@ -150,24 +341,23 @@ class SkillManager:
             console.print(f"[red]Error loading skill {skill_file_path}: {e}[/red]")
             return None
 
-    def _scan_skill_resources(self, skill_dir: Path) -> List[str]:
+    def _scan_skill_resources(self, skill_dir: str) -> List[str]:
         """扫描技能相关资源"""
-        resources = []
-
-        # 常见的资源目录
-        resource_dirs = ['scripts', 'templates', 'assets', 'references', 'examples']
-
-        for dir_name in resource_dirs:
-            resource_path = skill_dir / dir_name
-            if resource_path.exists() and resource_path.is_dir():
-                resources.append(str(resource_path))
-
-        # 扫描根目录下的其他文件
-        for item in skill_dir.iterdir():
-            if item.name != "SKILL.md" and item.is_file():
-                resources.append(str(item))
-
-        return resources
+        resource_dirs = []
+        files = []
+
+        # 一次 scandir 同时收集常见资源目录和根目录下的其他文件
+        with os.scandir(skill_dir) as it:
+            for entry in it:
+                if entry.name in _RESOURCE_DIRS:
+                    if entry.is_dir():
+                        resource_dirs.append(entry)
+                elif entry.name != "SKILL.md" and entry.is_file():
+                    files.append(entry.path)
+
+        # 资源目录保持固定顺序在前
+        resource_dirs.sort(key=lambda e: _RESOURCE_DIRS.index(e.name))
+        return [e.path for e in resource_dirs] + files
 
     def get_available_skills(self) -> Dict[str, str]:
         """获取可用技能的名称和描述（用于 LLM 发现）"""
@@ -189,7 +379,7 @@ class SkillManager:
 
         if skill_name not in self.active_skills:
             self.active_skills.append(skill_name)
-            self._save_config()
+            self._config_changed()
 
         return skill
 
@@ -197,7 +387,7 @@ class SkillManager:
         """停用指定技能"""
         if skill_name in self.active_skills:
             self.active_skills.remove(skill_name)
-            self._save_config()
+            self._config_changed()
 
     def disable_skill(self, skill_name: str):
         """禁用技能"""
@@ -205,7 +395,7 @@ class SkillManager:
             self.disabled_skills.append(skill_name)
             if skill_name in self.skills:
                 self.skills[skill_name].enabled = False
-            self._save_config()
+            self._config_changed()
 
     def enable_skill(self, skill_name: str):
         """启用技能"""
@@ -213,7 +403,7 @@ class SkillManager:
             self.disabled_skills.remove(skill_name)
             if skill_name in self.skills:
                 self.skills[skill_name].enabled = True
-            self._save_config()
+            self._config_changed()
 
     def get_active_skills_content(self) -> str:
         """获取所有激活技能的摘要（用于注入 LLM 上下文）
@@ -221,18 +411,25 @@ class SkillManager:
         只返回技能名称和描述，不返回完整 SKILL.md 内容。
         完整内容通过 activate_skill 工具按需注入。
         """
-        if not self.active_skills:
-            return ""
+        if self._active_content_cache is not None:
+            return self._active_content_cache
 
-        lines = [f"共 {len(self.active_skills)} 个激活技能："]
-        for skill_name in self.active_skills:
-            if skill_name in self.skills:
-                skill = self.skills[skill_name]
-                lines.append(f"- **{skill.name}**: {skill.description}")
-        return "\n".join(lines)
+        if not self.active_skills:
+            content = ""
+        else:
+            lines = [f"共 {len(self.active_skills)} 个激活技能："]
+            for skill_name in self.active_skills:
+                if skill_name in self.skills:
+                    skill = self.skills[skill_name]
+                    lines.append(f"- **{skill.name}**: {skill.description}")
+            content = "\n".join(lines)
+        self._active_content_cache = content
+        return content
 
     def list_skills(self, show_all: bool = False):
         """列出技能"""
+        from rich.table import Table
+
         table = Table(title="QozeCode Skills")
         table.add_column("Name", style="cyan", no_wrap=True)
         table.add_column("Tier", style="blue")
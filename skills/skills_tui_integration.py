@@ -10,7 +10,8 @@ class SkillsTUIHandler:
     """Skills 命令的 TUI 处理器 - 简化版本"""
 
     def __init__(self):
-        self.skill_manager = SkillManager()
+        # list/status 执行时都会 refresh_skills，构造时无需先扫描一遍技能目录
+        self.skill_manager = SkillManager(discover=False)
 
     def handle_skills_command(self, command_parts: list) -> tuple[bool, str]:
         """
@@ -120,6 +121,8 @@ class SkillsTUIHandler:
 
         skill_name = args[0]
         try:
+            if not self.skill_manager.skills:
+                self.skill_manager.refresh_skills()
             skill = self.skill_manager.activate_skill(skill_name)
             if skill:
                 return True, f"已激活技能: {skill_name}"
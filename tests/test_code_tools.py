@@ -0,0 +1,91 @@
+import re
+
+import pytest
+
+from tools.code_tools import _SYMBOL_PATTERNS, find_symbols
+
+
+def _reference_symbols(content, lang):
+    """原逐行实现：对去除首尾空白的每一行按模式顺序 match"""
+    compiled = [(re.compile(p), k) for p, k in _SYMBOL_PATTERNS[lang]]
+    found = []
+    for lineno, line in enumerate(content.split("\n"), start=1):
+        stripped = line.strip()
+        for pattern, kind in compiled:
+            m = pattern.match(stripped)
+            if m:
+                found.append((lineno, kind, m.group(1)))
+    return found
+
+
+def _rows(output):
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("| `"):
+            continue
+        cells = [c.strip().strip("`") for c in line.strip("|").split("|")]
+        rows.append((int(cells[1]), cells[2], cells[3]))
+    return rows
+
+
+PY_SAMPLE = """\
+class Foo:
+    def method(self):
+        pass
+
+    async   def  amethod(self):
+        pass
+
+class
+Bar:
+def
+    broken():
+\tclass Tabbed(Base):
+async def top_level():
+    pass
+def  spaced ( ):
+  # class NotAComment
+"""
+
+JAVA_SAMPLE = """\
+@RestController
+public class FooController {
+}
+@Service
+class BarService {}
+public interface Baz {
+}
+public
+class Split {}
+"""
+
+
+def _write_project(tmp_path, lang, source_name, source):
+    if lang == "python":
+        for name in ("pyproject.toml", "setup.py", "requirements.txt"):
+            (tmp_path / name).write_text("")
+    else:
+        (tmp_path / "pom.xml").write_text("<project/>")
+    (tmp_path / source_name).write_text(source)
+
+
+@pytest.mark.parametrize(
+    "lang, source_name, source",
+    [("python", "sample.py", PY_SAMPLE), ("java_maven", "Sample.java", JAVA_SAMPLE)],
+)
+def test_find_symbols_matches_line_by_line_reference(tmp_path, monkeypatch, lang, source_name, source):
+    _write_project(tmp_path, lang, source_name, source)
+    monkeypatch.chdir(tmp_path)
+
+    output = find_symbols.invoke({"keyword": "", "symbol_type": "all", "max_results": 100})
+
+    assert _rows(output) == _reference_symbols(source, lang)
+
+
+def test_find_symbols_does_not_match_across_lines(tmp_path, monkeypatch):
+    _write_project(tmp_path, "java_maven", "Sample.java", JAVA_SAMPLE)
+    monkeypatch.chdir(tmp_path)
+
+    output = find_symbols.invoke({"keyword": "FooController"})
+
+    assert _rows(output) == [(2, "class", "FooController")]
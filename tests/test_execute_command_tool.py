@@ -0,0 +1,84 @@
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+import tools.execute_command_tool as execute_command_tool
+from tools.execute_command_tool import execute_command
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="POSIX shell semantics")
+
+
+def _run(command, timeout=120):
+    return asyncio.run(execute_command.ainvoke({"command": command, "timeout": timeout}))
+
+
+def test_pwd_fast_path_matches_shell_through_symlink(tmp_path, monkeypatch):
+    real = tmp_path / "real"
+    real.mkdir()
+    link = tmp_path / "link"
+    link.symlink_to(real)
+    monkeypatch.chdir(link)
+    monkeypatch.setenv("PWD", str(link))
+
+    shell = subprocess.run(["sh", "-c", "pwd"], capture_output=True, text=True).stdout.strip()
+
+    assert _run("pwd") == shell == str(link)
+
+
+def test_pwd_fast_path_ignores_stale_pwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PWD", "/")
+
+    assert _run("pwd") == os.getcwd()
+
+
+def test_fast_path_errors_fall_back_to_process(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def broken_getcwd():
+        raise FileNotFoundError("cwd removed")
+
+    monkeypatch.setattr(execute_command_tool.os, "getcwd", broken_getcwd)
+
+    result = _run("pwd")
+
+    assert not result.startswith("[RUN_FAILED]")
+    assert result.strip()
+
+
+def test_fast_path_outputs():
+    assert _run("true") == "[SUCCESS] (No output)"
+    assert _run("false") == "[COMPLETED] (Exit Code: 1)\n"
+    assert _run("echo hello world") == "hello world"
+
+
+def test_timeout_escalates_to_sigkill(monkeypatch):
+    monkeypatch.setattr(execute_command_tool, "_KILL_GRACE_PERIOD", 0.2)
+
+    start = time.monotonic()
+    result = _run("trap '' TERM; echo started; sleep 30", timeout=1)
+
+    assert time.monotonic() - start < 10
+    assert result.startswith("[RUN_FAILED]❌ 命令执行超时 (1秒)")
+    assert "started" in result
+
+
+def test_script_without_shebang_runs_through_shell(tmp_path, monkeypatch):
+    script = tmp_path / "build.sh"
+    script.write_text("echo built\n")
+    script.chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+
+    assert _run("./build.sh") == "built"
+
+
+def test_non_executable_file_reports_shell_exit_code(tmp_path, monkeypatch):
+    (tmp_path / "data.sh").write_text("echo nope\n")
+    monkeypatch.chdir(tmp_path)
+
+    result = _run("./data.sh")
+
+    assert result.startswith("[COMPLETED] (Exit Code: 126)")
@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+from tools.file_tools import grep_file, replace_in_file, search_in_files
+
+
+def _write_lines(path, hits, total):
+    path.write_text("".join(f"hit{i}\n" if i in hits else f"line{i}\n" for i in range(1, total + 1)),
+                    encoding="utf-8")
+
+
+def _grep_lines(output):
+    return [line for line in output.splitlines()[1:] if line != "---"]
+
+
+def test_grep_file_includes_after_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {5}, 10)
+
+    output = grep_file.invoke({"paths": "a.txt", "keyword": "hit", "context_lines": 2})
+
+    assert _grep_lines(output) == [
+        "3:   line3",
+        "4:   line4",
+        "5: > hit5",
+        "6:   line6",
+        "7:   line7",
+    ]
+
+
+def test_grep_file_after_context_stops_at_eof(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {9}, 10)
+
+    output = grep_file.invoke({"paths": "a.txt", "keyword": "hit", "context_lines": 3})
+
+    assert _grep_lines(output) == ["6:   line6", "7:   line7", "8:   line8", "9: > hit9", "10:   line10"]
+
+
+def test_grep_file_without_context_reports_each_match(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {2, 3}, 5)
+
+    output = grep_file.invoke({"paths": "a.txt", "keyword": "hit"})
+
+    assert output.splitlines()[1:] == ["2: > hit2", "---", "3: > hit3", "---"]
+
+
+def test_search_in_files_includes_after_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {4}, 8)
+
+    output = search_in_files.invoke({"directory": ".", "keyword": "hit", "context_lines": 1})
+
+    assert _grep_lines(output) == ["a.txt:3:   line3", "a.txt:4: > hit4", "a.txt:5:   line5"]
+
+
+def test_grep_file_merges_overlapping_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {3, 5, 12}, 14)
+
+    output = grep_file.invoke({"paths": "a.txt", "keyword": "hit", "context_lines": 2})
+    body = output.splitlines()[1:]
+
+    assert body == [
+        "1:   line1",
+        "2:   line2",
+        "3: > hit3",
+        "4:   line4",
+        "5: > hit5",
+        "6:   line6",
+        "7:   line7",
+        "---",
+        "10:   line10",
+        "11:   line11",
+        "12: > hit12",
+        "13:   line13",
+        "14:   line14",
+        "---",
+    ]
+    line_numbers = [line.split(":")[0] for line in body if line != "---"]
+    assert len(line_numbers) == len(set(line_numbers))
+
+
+def test_grep_file_merges_consecutive_matches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_lines(tmp_path / "a.txt", {2, 3, 4}, 6)
+
+    output = grep_file.invoke({"paths": "a.txt", "keyword": "hit", "context_lines": 1})
+
+    assert output.splitlines()[1:] == [
+        "1:   line1", "2: > hit2", "3: > hit3", "4: > hit4", "5:   line5", "---",
+    ]
+
+
+def test_search_in_files_matches_replacement_char_from_invalid_bytes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # \xff 不是合法 UTF-8，按 errors="replace" 解码后变为 U+FFFD
+    (tmp_path / "a.txt").write_bytes(b"ok\nbad\xffbyte\n")
+
+    output = search_in_files.invoke({"directory": ".", "keyword": "bad�byte"})
+
+    assert "a.txt:2: > bad�byte" in output.splitlines()
+
+
+def test_replace_in_file_rewrites_content_and_keeps_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = tmp_path / "a.txt"
+    target.write_text("foo\nbar foo\n", encoding="utf-8")
+    target.chmod(0o640)
+
+    output = replace_in_file.invoke({"path": "a.txt", "old_text": "foo", "new_text": "baz"})
+
+    assert "replaced 2 occurrence(s)" in output
+    assert target.read_bytes() == b"baz\nbar baz\n"
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["a.txt"]
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="hard links not supported")
+def test_replace_in_file_keeps_hard_links(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = tmp_path / "a.txt"
+    target.write_text("old\n", encoding="utf-8")
+    os.link(target, tmp_path / "b.txt")
+    inode = target.stat().st_ino
+
+    replace_in_file.invoke({"path": "a.txt", "old_text": "old", "new_text": "new"})
+
+    assert target.stat().st_ino == inode
+    assert (tmp_path / "b.txt").read_text(encoding="utf-8") == "new\n"
+
+
+def test_replace_in_file_translates_newlines_like_text_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(os, "linesep", "\r\n")
+    target = tmp_path / "a.txt"
+    target.write_bytes(b"one\r\ntwo\r\n")
+
+    replace_in_file.invoke({"path": "a.txt", "old_text": "two", "new_text": "2"})
+
+    assert target.read_bytes() == b"one\r\n2\r\n"
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import qoze_mcp.mcp_client as mcp_client
+from qoze_mcp.mcp_client import MCPClientWrapper
+from qoze_mcp.mcp_manager import MCPManager, MCPServerConfig
+
+
+class FakeMultiServerMCPClient:
+    def __init__(self, connections):
+        self.connections = connections
+
+    async def get_tools(self, server_name=None):
+        return []
+
+
+@pytest.fixture
+def servers():
+    return {
+        "cached": MCPServerConfig(name="cached", command="cached-server"),
+        "live": MCPServerConfig(name="live", command="live-server"),
+    }
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "mcp_tools_cache.json"
+    monkeypatch.setattr(mcp_client, "_TOOLS_CACHE_FILE", path)
+    monkeypatch.setattr(mcp_client, "MultiServerMCPClient", FakeMultiServerMCPClient)
+    return path
+
+
+def _write_cache(path, wrapper, name, config, saved_at=None):
+    server_cfg = wrapper._build_server_config(config)
+    entry = {
+        "fingerprint": wrapper._fingerprint(server_cfg),
+        "saved_at": time.time() if saved_at is None else saved_at,
+        "tools": [{
+            "name": "echo",
+            "description": "echo input",
+            "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}},
+            "metadata": None,
+        }],
+    }
+    path.write_text(json.dumps({name: entry}))
+
+
+def test_partial_cache_hit_keeps_cached_servers_connected(cache_file, servers):
+    wrapper = MCPClientWrapper()
+    _write_cache(cache_file, wrapper, "cached", servers["cached"])
+
+    cached = wrapper.load_cached_tools(servers)
+    assert [t.name for t in cached["cached"]] == ["echo"]
+
+    asyncio.run(wrapper.connect_each({"live": servers["live"]}))
+
+    assert set(wrapper._server_configs) == {"cached", "live"}
+    assert set(wrapper._client.connections) == {"cached", "live"}
+
+
+def test_cached_tools_are_built_with_server_name(cache_file, servers, monkeypatch):
+    wrapper = MCPClientWrapper()
+    _write_cache(cache_file, wrapper, "cached", servers["cached"])
+    calls = []
+    real_convert = mcp_client.convert_mcp_tool_to_langchain_tool
+
+    def recording_convert(*args, **kwargs):
+        calls.append(kwargs)
+        return real_convert(*args, **kwargs)
+
+    monkeypatch.setattr(mcp_client, "convert_mcp_tool_to_langchain_tool", recording_convert)
+
+    wrapper.load_cached_tools(servers)
+
+    assert [c.get("server_name") for c in calls] == ["cached"]
+
+
+def test_expired_cache_is_ignored(cache_file, servers):
+    wrapper = MCPClientWrapper({"tools_cache_ttl": 60})
+    _write_cache(cache_file, wrapper, "cached", servers["cached"], saved_at=time.time() - 120)
+
+    assert wrapper.load_cached_tools(servers) == {}
+    assert wrapper._client is None
+
+
+def test_deactivate_keeps_other_servers_and_cancels_refresh(cache_file, servers, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    async def scenario():
+        manager = MCPManager()
+        manager._servers = dict(servers)
+        manager._active_servers = list(servers)
+        manager._client_wrapper._build_client_config(servers)
+        refresh = asyncio.create_task(asyncio.sleep(3600))
+        manager._cache_refresh_task = refresh
+
+        await manager.deactivate_server("live")
+
+        assert refresh.cancelled()
+        assert manager._cache_refresh_task is None
+        assert set(manager._client_wrapper._server_configs) == {"cached"}
+
+        manager._cache_refresh_task = refresh = asyncio.create_task(asyncio.sleep(3600))
+        await manager.shutdown()
+        assert refresh.cancelled()
+        assert not manager._client_wrapper.is_connected
+
+    asyncio.run(scenario())
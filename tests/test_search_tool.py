@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tavily")
+pytest.importorskip("html2text")
+
+import tools.search_tool as search_tool
+
+
+@pytest.fixture(autouse=True)
+def reset_client(monkeypatch):
+    monkeypatch.setattr(search_tool, "_http_client", None)
+    monkeypatch.setattr(search_tool, "_http_client_loop", None)
+
+
+def test_aclose_http_client_closes_shared_client():
+    async def scenario():
+        client = search_tool._get_http_client()
+        await search_tool.aclose_http_client()
+        return client
+
+    client = asyncio.run(scenario())
+
+    assert client.is_closed
+    assert search_tool._http_client is None
+
+
+def test_loop_change_closes_previous_client_on_its_loop():
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def create():
+            return search_tool._get_http_client()
+
+        old_client = asyncio.run_coroutine_threadsafe(create(), other_loop).result(5)
+
+        async def scenario():
+            return search_tool._get_http_client()
+
+        new_client = asyncio.run(scenario())
+
+        deadline = time.monotonic() + 5
+        while not old_client.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert old_client.is_closed
+        assert new_client is not old_client
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(5)
+        other_loop.close()
@@ -0,0 +1,57 @@
+import json
+import threading
+
+import pytest
+
+import skills.skill_manager as skill_manager
+from skills.skill_manager import SkillManager
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.chdir(tmp_path)
+    return home
+
+
+def _write_skill(directory, name):
+    directory.mkdir(parents=True)
+    (directory / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {name} skill\n---\n\n# {name}\n", encoding="utf-8"
+    )
+
+
+def test_discovers_symlinked_skill_directory(home, tmp_path):
+    _write_skill(tmp_path / "elsewhere" / "linked", "linked-skill")
+    user_skills = home / ".qoze" / "skills"
+    user_skills.mkdir(parents=True)
+    (user_skills / "linked").symlink_to(tmp_path / "elsewhere" / "linked")
+
+    manager = SkillManager()
+
+    assert "linked-skill" in manager.skills
+    assert "# linked-skill" in manager.skills["linked-skill"].content
+
+
+def test_concurrent_config_saves_do_not_collide(home, monkeypatch):
+    manager = SkillManager(discover=False)
+    printed = []
+    monkeypatch.setattr(skill_manager.console, "print", lambda *args, **kwargs: printed.append(args))
+
+    def save_many(name):
+        for i in range(50):
+            manager.active_skills.append(f"{name}-{i}")
+            manager._save_config()
+
+    threads = [threading.Thread(target=save_many, args=(f"t{n}",)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert printed == []
+    saved = json.loads(manager.config_file.read_text(encoding="utf-8"))
+    assert sorted(saved["active_skills"]) == sorted(manager.active_skills)
+    assert [p.name for p in manager.config_file.parent.iterdir() if p.suffix == ".tmp"] == []
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import tools.skill_tools as skill_tools
+from tools.skill_tools import activate_skill
+
+
+class FakeSkill:
+    def __init__(self):
+        self.read_in = None
+
+    @property
+    def content(self):
+        self.read_in = threading.get_ident()
+        return "skill body"
+
+
+class FakeSkillManager:
+    def __init__(self):
+        self.skill = FakeSkill()
+        self.skills = {"demo": self.skill}
+
+    def activate_skill(self, name):
+        return self.skills.get(name)
+
+
+def test_activate_skill_reads_content_off_the_event_loop(monkeypatch):
+    manager = FakeSkillManager()
+    monkeypatch.setattr(skill_tools, "_skill_manager", manager)
+
+    async def scenario():
+        result = await activate_skill.ainvoke({"skill_name": "demo"})
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(scenario())
+
+    assert result.endswith("skill body")
+    assert result.startswith("[SKILL_ACTIVATED]")
+    assert manager.skill.read_in is not None
+    assert manager.skill.read_in != loop_thread
@@ -0,0 +1,35 @@
+import utils.system_prompt as system_prompt
+from utils.system_prompt import get_dynamic_context
+
+ENV_HEADER = """## 系统环境信息
+**操作系统**: Linux 6.1 (#1 SMP)
+**架构**: x86_64
+**处理器**: cpu
+**Shell**: /bin/bash
+**python环境**: 基本python，需要的像excel等工具库都已经安装
+
+## 当前环境
+**工作目录**: /work
+
+## 当前项目目录
+tree
+"""
+
+
+def _context(monkeypatch, **kwargs):
+    monkeypatch.setattr(system_prompt, "_get_env_tools_context", lambda: "")
+    return get_dynamic_context("Linux", "6.1", "#1 SMP", "x86_64", "cpu", "/bin/bash",
+                               "/work", "tree", **kwargs)
+
+
+def test_git_context_section_follows_environment_header(monkeypatch):
+    context = _context(monkeypatch, git_context="## Git\nbranch: main", rules_prompt="RULES")
+
+    assert context == ENV_HEADER + "\n## Git\nbranch: main\n" + "\nRULES\n"
+
+
+def test_empty_git_context_adds_nothing(monkeypatch):
+    context = _context(monkeypatch)
+
+    assert context == ENV_HEADER
+    assert "if git_context" not in context
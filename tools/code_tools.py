@@ -250,6 +250,24 @@ _SYMBOL_PATTERNS = {
 }
 
 
+def _compile_symbol_pattern(pattern: str) -> re.Pattern:
+    """将"匹配去除首尾空白后的行首"的模式转换为整段文本上的 MULTILINE 模式
+
+    逐行匹配时模式不可能跨行：\\s 改写为不含换行的空白 [^\\S\\n]，
+    模式中的字面 \\n 仍可能跨行，由调用方丢弃包含换行的匹配 (见 find_symbols)。
+    """
+    body = pattern[1:] if pattern.startswith("^") else pattern
+    body = body.replace(r"\s", r"[^\S\n]")
+    return re.compile(r"^[^\S\n]*(?:" + body + ")", re.MULTILINE)
+
+
+# 符号正则在导入时统一预编译，避免每行、每个模式都经过 re 模块的缓存查找
+_COMPILED_SYMBOL_PATTERNS = {
+    lang: [(_compile_symbol_pattern(pattern), kind) for pattern, kind in patterns]
+    for lang, patterns in _SYMBOL_PATTERNS.items()
+}
+
+
 @tool
 def find_symbols(keyword: str = "", symbol_type: str = "all", max_results: int = 60) -> str:
     """
@@ -276,7 +294,7 @@ def find_symbols(keyword: str = "", symbol_type: str = "all", max_results: int =
     try:
         root = Path.cwd()
         lang, _, exts = _detect_lang(root)
-        patterns = _SYMBOL_PATTERNS.get(lang, _SYMBOL_PATTERNS["python"])
+        patterns = _COMPILED_SYMBOL_PATTERNS.get(lang, _COMPILED_SYMBOL_PATTERNS["python"])
         
         # 如果 symbol_type 给定了，只保留匹配的 pattern
         if symbol_type != "all":
@@ -306,16 +324,25 @@ def find_symbols(keyword: str = "", symbol_type: str = "all", max_results: int =
             except ValueError:
                 rel = str(file_path)
             
-            for line_no, line in enumerate(content.split("\n"), 1):
-                for pattern, kind in patterns:
-                    match = re.match(pattern, line.strip())
-                    if match:
-                        name = match.group(1)
-                        if keyword_lower and keyword_lower not in name.lower():
-                            continue
-                        symbols.append((rel, line_no, kind, name))
-                        if len(symbols) >= max_results:
-                            break
+            # 每个模式对整段文本做一次 finditer，由正则引擎扫描，而不是逐行逐模式调用 match
+            matches = []
+            for order, (pattern, kind) in enumerate(patterns):
+                for match in pattern.finditer(content):
+                    # 与逐行匹配保持一致：跨行的匹配不计入
+                    if "\n" in match.group(0):
+                        continue
+                    name = match.group(1)
+                    if keyword_lower and keyword_lower not in name.lower():
+                        continue
+                    matches.append((match.start(), order, kind, name))
+            matches.sort()
+
+            # 按位置顺序增量统计换行数得到行号
+            line_no, last_pos = 1, 0
+            for pos, _, kind, name in matches:
+                line_no += content.count("\n", last_pos, pos)
+                last_pos = pos
+                symbols.append((rel, line_no, kind, name))
                 if len(symbols) >= max_results:
                     break
             if len(symbols) >= max_results:
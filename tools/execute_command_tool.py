@@ -1,6 +1,9 @@
 import asyncio
+from collections import deque
 import os
 import platform
+import re
+import shlex
 import signal
 
 from langchain_core.tools import tool
@@ -9,6 +12,108 @@ from langchain_core.tools import tool
 # 移除 shared_console 的直接引用，防止直接打印破坏 TUI
 # from shared_console import console
 
+# 平台在进程生命周期内不会变化, 导入时判断一次即可
+_IS_WINDOWS = platform.system() == "Windows"
+
+# 每次从管道读取的最大字节数
+_READ_CHUNK_SIZE = 64 * 1024
+
+# 返回给 Agent 的最大输出行数, 超出部分只保留末尾 (构建/安装日志的关键信息通常在最后)
+_MAX_OUTPUT_LINES = 10000
+
+# 超时后 SIGTERM 到 SIGKILL 之间的宽限时间 (秒)
+_KILL_GRACE_PERIOD = 2
+
+# 包含这些字符的命令需要 shell 解释 (管道、重定向、变量、通配符、引号等)
+_SHELL_META_RE = re.compile(r'[|&;<>$`\\*?\[\](){}!"\'~#=%\n]')
+
+# shell 内建命令无法直接 exec, 仍需交给 /bin/sh
+_SHELL_BUILTINS = frozenset({
+    "cd", "export", "unset", "source", ".", "alias", "unalias", "set", "exit",
+    "eval", "exec", "ulimit", "umask", "type", "hash", "read", "shift", "trap", "wait",
+})
+
+
+def _logical_cwd() -> str:
+    """与 shell 的 pwd 一致: $PWD 为绝对路径且与当前目录是同一目录时返回 $PWD (保留符号链接), 否则返回物理路径"""
+    cwd = os.getcwd()
+    env_pwd = os.environ.get("PWD")
+    if env_pwd and os.path.isabs(env_pwd) and os.path.normpath(env_pwd) == env_pwd:
+        try:
+            if os.path.samefile(env_pwd, cwd):
+                return env_pwd
+        except OSError:
+            pass
+    return cwd
+
+
+def _try_fast_path(command: str):
+    """pwd/true/false/echo 等无副作用的探测命令直接在进程内求值, 省去一次进程创建。
+
+    Returns:
+        命令的输出结果; 不适用快速路径时返回 None
+    """
+    if _IS_WINDOWS or _SHELL_META_RE.search(command):
+        return None
+    argv = shlex.split(command)
+    name, args = argv[0], argv[1:]
+    if name == "pwd" and not args:
+        return _logical_cwd()
+    if name == "true" and not args:
+        return "[SUCCESS] (No output)"
+    if name == "false" and not args:
+        return "[COMPLETED] (Exit Code: 1)\n"
+    # echo 带选项 (-n/-e 等) 时各 shell 行为不一致, 交给真实进程处理
+    if name == "echo" and args and not args[0].startswith("-"):
+        return " ".join(args)
+    return None
+
+
+async def _spawn(command: str):
+    """启动子进程: 不含 shell 元字符的简单命令直接 exec, 省去一次 /bin/sh 的 fork+exec"""
+    kwargs = dict(
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,  # 将 stderr 合并到 stdout
+        # start_new_session 让子进程成为新进程组的组长, 以便超时时终止整个进程组 (Linux/macOS)
+        # 不使用 preexec_fn: 它会强制 CPython 走 fork+exec 慢路径, 无法启用 vfork/posix_spawn
+        start_new_session=not _IS_WINDOWS,
+        limit=1024 * 1024  # 增加 buffer limit 防止大量输出卡死
+    )
+
+    if not _IS_WINDOWS and not _SHELL_META_RE.search(command):
+        argv = shlex.split(command)
+        if argv and argv[0] not in _SHELL_BUILTINS:
+            try:
+                return await asyncio.create_subprocess_exec(*argv, **kwargs)
+            except OSError:
+                # 命令不存在、无 shebang 的脚本 (ENOEXEC)、无执行权限等 exec 失败时交给 shell,
+                # 保持原有的输出与退出码 ("command not found"/127、126 等)
+                pass
+
+    return await asyncio.create_subprocess_shell(command, **kwargs)
+
+
+async def _terminate(process):
+    """先 SIGTERM 整个进程组给予清理机会, 宽限期后仍未退出则 SIGKILL, 最后回收子进程"""
+    if _IS_WINDOWS:
+        process.kill()
+        await process.wait()
+        return
+
+    # start_new_session 保证子进程的进程组 ID 就是它的 pid, 无需再 getpgid
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            break
+        try:
+            await asyncio.wait_for(process.wait(), timeout=_KILL_GRACE_PERIOD)
+            return
+        except asyncio.TimeoutError:
+            continue
+    await process.wait()
+
+
 @tool
 async def execute_command(command: str, timeout: int = 120) -> str:
     """Execute a command in the current system environment and return the output with real-time progress.
@@ -27,48 +132,61 @@ async def execute_command(command: str, timeout: int = 120) -> str:
         return "❌ Empty command"
 
     try:
-        # 使用 asyncio.create_subprocess_shell 非阻塞执行
-        # 设置 preexec_fn 为 setsid 以便能终止整个进程组 (Linux/macOS)
-        preexec = os.setsid if platform.system() != "Windows" else None
+        fast_result = _try_fast_path(command)
+    except Exception:
+        # 快速路径求值失败 (如当前目录已被删除、引号不匹配) 时交给真实进程处理, 保持 shell 的输出
+        fast_result = None
+    if fast_result is not None:
+        return fast_result
 
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,  # 将 stderr 合并到 stdout
-            preexec_fn=preexec,
-            limit=1024 * 1024  # 增加 buffer limit 防止大量输出卡死
-        )
-
-        output_lines = []
-
-        async def read_stream(stream):
+    try:
+        # 非阻塞执行
+        process = await _spawn(command)
+
+        output_lines = deque(maxlen=_MAX_OUTPUT_LINES)
+        total_lines = 0
+
+        def join_output():
+            dropped = total_lines - len(output_lines)
+            text = "\n".join(output_lines)
+            if dropped > 0:
+                return f"... (truncated, 已省略前 {dropped} 行, max_lines={_MAX_OUTPUT_LINES})\n{text}"
+            return text
+
+        async def read_until_exit(stream):
+            nonlocal total_lines
+            # 按块读取而非 readline: 超长无换行的输出 (如 \r 刷新的进度条) 不会触发 limit 溢出或卡住读取
+            pending = bytearray()
             while True:
-                line = await stream.readline()
-                if not line:
+                chunk = await stream.read(_READ_CHUNK_SIZE)
+                if not chunk:
                     break
-                # 解码并去除末尾换行
-                decoded_line = line.decode('utf-8', errors='replace').rstrip()
-                output_lines.append(decoded_line)
-
-        # 设置超时等待
+                pending += chunk
+                cut = pending.rfind(b"\n")
+                if cut < 0:
+                    continue
+                # 整块解码完整行 (换行符不会出现在 UTF-8 多字节序列中), 再按行切分并去除行尾空白
+                text = pending[:cut].decode('utf-8', errors='replace')
+                del pending[:cut + 1]
+                lines = text.split("\n")
+                total_lines += len(lines)
+                output_lines.extend(line.rstrip() for line in lines)
+            if pending:
+                total_lines += 1
+                output_lines.append(pending.decode('utf-8', errors='replace').rstrip())
+            return await process.wait()
+
+        # 设置超时等待: 读取输出与等待退出共用同一个截止时间, 只需一个计时器
         try:
-            # 等待进程完成或超时
-            await asyncio.wait_for(read_stream(process.stdout), timeout=timeout)
-            return_code = await asyncio.wait_for(process.wait(), timeout=5)  # 给一点额外时间让进程退出
+            return_code = await asyncio.wait_for(read_until_exit(process.stdout), timeout=timeout)
 
         except asyncio.TimeoutError:
-            # 超时处理
-            if platform.system() != "Windows":
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                except ProcessLookupError:
-                    pass
-            else:
-                process.terminate()
-
-            return f"[RUN_FAILED]❌ 命令执行超时 ({timeout}秒)\n已捕获输出:\n" + "\n".join(output_lines)
-
-        full_output = "\n".join(output_lines)
+            # 超时处理: 终止整个进程组并回收子进程, 避免遗留僵尸进程和未关闭的管道
+            await _terminate(process)
+
+            return f"[RUN_FAILED]❌ 命令执行超时 ({timeout}秒)\n已捕获输出:\n" + join_output()
+
+        full_output = join_output()
 
         # 处理成功但无输出的情况
         if return_code == 0:
@@ -1,11 +1,15 @@
+import io
 import os
 import fnmatch
+import shutil
+import tempfile
+from collections import deque
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from langchain_core.tools import tool
 
-from utils.directory_config import EXCLUDE_DIRECTORIES
+from utils.directory_config import is_excluded_name
 
 
 def _is_path_within_base(base: Path, target: Path) -> bool:
@@ -44,15 +48,6 @@ def _resolve_under_cwd(path: str) -> Path:
     return target
 
 
-def _is_excluded(name: str) -> bool:
-    for pattern in EXCLUDE_DIRECTORIES:
-        if pattern == name:
-            return True
-        if "*" in pattern and fnmatch.fnmatch(name, pattern):
-            return True
-    return False
-
-
 def _iter_files(directory: Path, include_hidden: bool) -> Iterable[Path]:
     for root, dirs, files in os.walk(directory):
         root_path = Path(root)
@@ -60,7 +55,7 @@ def _iter_files(directory: Path, include_hidden: bool) -> Iterable[Path]:
         # Filter directories in-place for os.walk
         filtered_dirs = []
         for d in dirs:
-            if _is_excluded(d):
+            if is_excluded_name(d):
                 continue
             if not include_hidden and d.startswith("."):
                 continue
@@ -68,13 +63,42 @@ def _iter_files(directory: Path, include_hidden: bool) -> Iterable[Path]:
         dirs[:] = filtered_dirs
 
         for f in files:
-            if _is_excluded(f):
+            if is_excluded_name(f):
                 continue
             if not include_hidden and f.startswith("."):
                 continue
             yield root_path / f
 
 
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _skip_lines(f, count: int) -> bool:
+    """将二进制文件指针移动到第 count 个换行符之后。
+
+    Returns:
+        文件包含至少 count 个换行符时返回 True，否则返回 False
+    """
+    remaining = count
+    offset = 0
+    # 复用同一块缓冲区 readinto，大文件跳行时不再为每个分块分配新的 bytes 对象
+    buf = bytearray(_READ_CHUNK_SIZE)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            return False
+        found = buf.count(b"\n", 0, n)
+        if found < remaining:
+            remaining -= found
+            offset += n
+            continue
+        pos = -1
+        for _ in range(remaining):
+            pos = buf.find(b"\n", pos + 1, n)
+        f.seek(offset + pos + 1)
+        return True
+
+
 @tool
 def read_file(path: str, start_line: int = 1, end_line: int = 200) -> str:
     """Read a file by line range with safe limits.
@@ -98,13 +122,14 @@ def read_file(path: str, start_line: int = 1, end_line: int = 200) -> str:
             return f"Error: Path is not a file: {path}"
 
         lines: List[str] = []
-        with target.open("r", encoding="utf-8", errors="replace") as f:
-            for idx, line in enumerate(f, start=1):
-                if idx < start_line:
-                    continue
+        with target.open("rb") as f:
+            # 起始行之前的内容只做字节级换行计数，不解码、不逐行构造对象
+            if start_line > 1 and not _skip_lines(f, start_line - 1):
+                return "Warning: No content in the specified range."
+            for idx, line in enumerate(f, start=start_line):
                 if idx > end_line:
                     break
-                lines.append(f"{idx:6d}: {line.rstrip()}")
+                lines.append(f"{idx:6d}: {line.decode('utf-8', errors='replace').rstrip()}")
 
         if not lines:
             return "Warning: No content in the specified range."
@@ -221,15 +246,14 @@ def list_dir(directory: str = ".", include_hidden: bool = False, max_results: in
         if not target_dir.is_dir():
             return f"Error: Path is not a directory: {directory}"
 
-        entries = []
-        for item in sorted(target_dir.iterdir(), key=lambda p: p.name.lower()):
-            name = item.name
-            if not include_hidden and name.startswith("."):
-                continue
-            suffix = "/" if item.is_dir() else ""
-            entries.append(name + suffix)
-            if len(entries) >= max_results:
-                break
+        # scandir 一次拿到名称与类型，排序键在构建时算好，排序时不再调用 lambda 和 stat
+        with os.scandir(target_dir) as it:
+            keyed = sorted(
+                (entry.name.lower(), entry.name + ("/" if entry.is_dir() else ""))
+                for entry in it
+                if include_hidden or not entry.name.startswith(".")
+            )
+        entries = [display for _, display in keyed[:max_results]]
 
         if not entries:
             return "No entries found."
@@ -282,7 +306,7 @@ def find_files(
             else:
                 filtered_dirs = []
                 for d in dirs:
-                    if _is_excluded(d):
+                    if is_excluded_name(d):
                         continue
                     if not include_hidden and d.startswith("."):
                         continue
@@ -303,7 +327,7 @@ def find_files(
 
             if file_type in ("file", "all"):
                 for f in files:
-                    if _is_excluded(f):
+                    if is_excluded_name(f):
                         continue
                     if not include_hidden and f.startswith("."):
                         continue
@@ -368,6 +392,64 @@ def find_files(
 #         return f"Error getting file stats: {str(e)}"
 
 
+def _iter_keyword_matches(lines: Iterable[str], keyword: str,
+                          context_lines: int) -> Iterator[list[tuple[int, str, bool]]]:
+    """逐行匹配关键字，产出命中行及其前后 context_lines 行组成的输出块。
+
+    块内元素为 (行号, 去换行文本, 是否命中)。单次遍历：前文用定长 deque 暂存，
+    命中后用 after_needed 倒数收集后文；相邻命中的上下文窗口重叠时合并为同一块，
+    已输出的行 (行号 <= last_emitted) 不会重复出现。
+    """
+    before: deque[tuple[int, str, bool]] = deque(maxlen=context_lines)
+    block: list[tuple[int, str, bool]] = []
+    last_emitted = 0
+    after_needed = 0
+    for idx, line in enumerate(lines, start=1):
+        text = line.rstrip("\n")
+        if keyword in line:
+            block.extend(item for item in before if item[0] > last_emitted)
+            before.clear()
+            block.append((idx, text, True))
+            last_emitted = idx
+            after_needed = context_lines
+        elif after_needed:
+            block.append((idx, text, False))
+            last_emitted = idx
+            after_needed -= 1
+        elif context_lines:
+            before.append((idx, text, False))
+        # 之后的命中行距离已超过 context_lines，窗口不会再与当前块重叠
+        if block and not after_needed and idx >= last_emitted + context_lines:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _iter_byte_line_matches(data: bytes, needle: bytes) -> Iterator[tuple[int, str]]:
+    """无上下文匹配的快速路径：直接在原始字节上 find 跳到下一处命中，只解码命中行。
+
+    行号用 bytes.count 增量计算；调用方需保证 needle 不含换行符，
+    且 data 的换行只有 \n 或 \r\n (此时分行结果与 TextIOWrapper 的通用换行一致)。
+    """
+    lnum = 1
+    counted = 0
+    pos = data.find(needle)
+    while pos >= 0:
+        start = data.rfind(b"\n", 0, pos) + 1
+        end = data.find(b"\n", pos)
+        if end < 0:
+            end = len(data)
+        lnum += data.count(b"\n", counted, start)
+        counted = start
+        line = data[start:end]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        yield lnum, line.decode("utf-8", errors="replace")
+        # 同一行内的多处命中只报告一次
+        pos = data.find(needle, end + 1)
+
+
 @tool
 def grep_file(paths: str | list[str], keyword: str, context_lines: int = 0, max_matches: int = 200) -> str:
     """Grep-like search within one or multiple files.
@@ -401,32 +483,19 @@ def grep_file(paths: str | list[str], keyword: str, context_lines: int = 0, max_
                 results.append(f"Error: Path is not a file: {path}")
                 continue
 
-            # Basic text/binary detection: treat files with NUL bytes as binary
-            with target.open("rb") as f:
-                sample = f.read(4096)
-                if b"\x00" in sample:
+            # 只打开一次文件：先在二进制流上做 NUL 探测，再回到开头包装为文本流逐行匹配
+            with target.open("rb") as raw:
+                # Basic text/binary detection: treat files with NUL bytes as binary
+                if b"\x00" in raw.read(4096):
                     results.append(f"Error: Binary file detected (skipped): {path}")
                     continue
+                raw.seek(0)
 
-            buffer: List[str] = []
-            buffer_lines: List[int] = []
-            results.append(f"[GREP_FILE] {target} keyword='{keyword[:60]}'")
-            with target.open("r", encoding="utf-8", errors="replace") as f:
-                for idx, line in enumerate(f, start=1):
-                    line_clean = line.rstrip("\n")
-                    buffer.append(line_clean)
-                    buffer_lines.append(idx)
-                    if len(buffer) > context_lines * 2 + 1:
-                        buffer.pop(0)
-                        buffer_lines.pop(0)
-
-                    if keyword in line:
-                        start_idx = max(0, len(buffer) - (context_lines + 1))
-                        end_idx = len(buffer)
-                        for i in range(start_idx, end_idx):
-                            lnum = buffer_lines[i]
-                            ctx_line = buffer[i]
-                            prefix = ">" if keyword in ctx_line else " "
+                results.append(f"[GREP_FILE] {target} keyword='{keyword[:60]}'")
+                with io.TextIOWrapper(raw, encoding="utf-8", errors="replace") as f:
+                    for block in _iter_keyword_matches(f, keyword, context_lines):
+                        for lnum, ctx_line, ctx_matched in block:
+                            prefix = ">" if ctx_matched else " "
                             results.append(f"{lnum}: {prefix} {ctx_line}")
                         results.append("---")
                         if len(results) >= max_matches:
@@ -477,6 +546,13 @@ def search_in_files(
 
         base = Path.cwd().resolve()
         results: List[str] = []
+        # 关键字不跨行时，先在原始字节上做一次 C 级子串查找，未命中的文件无需解码和逐行扫描。
+        # 关键字含替换字符 U+FFFD 时不做字节预筛：errors="replace" 解码会把非法字节变成 U+FFFD，
+        # 原始字节中没有该关键字的文件解码后仍可能命中
+        needle = (keyword.encode("utf-8")
+                  if "\n" not in keyword and "\r" not in keyword and "\ufffd" not in keyword else None)
+        # 无上下文时命中行可直接在字节上定位
+        use_byte_scan = needle is not None and context_lines == 0
 
         for file_path in _iter_files(target_dir, include_hidden=False):
             if file_glob and not fnmatch.fnmatch(file_path.name, file_glob):
@@ -484,23 +560,27 @@ def search_in_files(
             try:
                 if file_path.stat().st_size > max_file_bytes:
                     continue
+                data = file_path.read_bytes()
+                if needle is not None and needle not in data:
+                    continue
                 rel_path = str(file_path.resolve().relative_to(base))
-                with file_path.open("r", encoding="utf-8", errors="replace") as f:
-                    buffer: List[str] = []
-                    for idx, line in enumerate(f, start=1):
-                        buffer.append(line.rstrip("\n"))
-                        if len(buffer) > context_lines * 2 + 1:
-                            buffer.pop(0)
-                        if keyword in line:
-                            start_idx = max(0, len(buffer) - (context_lines + 1))
-                            end_idx = len(buffer)
-                            for offset, ctx_line in enumerate(buffer[start_idx:end_idx],
-                                                              start=idx - (end_idx - start_idx) + 1):
-                                prefix = ">" if keyword in ctx_line else " "
-                                results.append(f"{rel_path}:{offset}: {prefix} {ctx_line}")
-                            results.append("---")
-                            if len(results) >= max_results:
-                                break
+                if use_byte_scan and data.count(b"\r") == data.count(b"\r\n"):
+                    for lnum, line in _iter_byte_line_matches(data, needle):
+                        results.append(f"{rel_path}:{lnum}: > {line}")
+                        results.append("---")
+                        if len(results) >= max_results:
+                            break
+                    if len(results) >= max_results:
+                        break
+                    continue
+                with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace") as f:
+                    for block in _iter_keyword_matches(f, keyword, context_lines):
+                        for lnum, ctx_line, ctx_matched in block:
+                            prefix = ">" if ctx_matched else " "
+                            results.append(f"{rel_path}:{lnum}: {prefix} {ctx_line}")
+                        results.append("---")
+                        if len(results) >= max_results:
+                            break
                 if len(results) >= max_results:
                     break
             except Exception:
@@ -539,6 +619,55 @@ def search_in_files(
 #         return f"Error writing file: {str(e)}"
 
 
+def _can_replace_file(target: Path) -> bool:
+    """判断能否用新文件替换 target 而不丢失其属性。
+
+    os.replace 会换成新的 inode：硬链接会断开，属主/属组变成当前用户，扩展属性 (含 ACL) 不会保留。
+    这些情况下只能原地覆写。
+    """
+    st = target.stat()
+    if st.st_nlink > 1:
+        return False
+    if hasattr(os, "geteuid") and (st.st_uid != os.geteuid() or st.st_gid != os.getegid()):
+        return False
+    if hasattr(os, "listxattr"):
+        try:
+            if os.listxattr(target):
+                return False
+        except OSError:
+            pass
+    return True
+
+
+def _atomic_write_text(target: Path, text: str) -> None:
+    """以 UTF-8 写回文本文件，换行符按文本模式转换为 os.linesep。
+
+    能安全替换时先写入同目录临时文件再 os.replace 覆盖，写入中途失败不会留下半截文件；
+    否则 (硬链接、属主不同、带扩展属性) 退回原地覆写，保留文件原有的 inode 与属性。
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    data = text.encode("utf-8")
+
+    if not _can_replace_file(target):
+        with target.open("wb") as f:
+            f.write(data)
+        return
+
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        shutil.copymode(target, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 @tool
 def replace_in_file(path: str, old_text: str, new_text: str) -> str:
     """Replace an exact string with new text in a file.
@@ -566,14 +695,14 @@ def replace_in_file(path: str, old_text: str, new_text: str) -> str:
         with target.open("r", encoding="utf-8", errors="replace") as f:
             file_content = f.read()
 
-        if old_text not in file_content:
+        # count 一次扫描同时完成存在性检查，避免先 in 再 count 的两遍全文扫描
+        count = file_content.count(old_text)
+        if count == 0:
             return "Error: old_text not found in file. Ensure exact match including whitespace."
 
-        count = file_content.count(old_text)
         new_content = file_content.replace(old_text, new_text)
 
-        with target.open("w", encoding="utf-8") as f:
-            f.write(new_content)
+        _atomic_write_text(target, new_content)
 
         return f"[REPLACE_IN_FILE] Successfully replaced {count} occurrence(s) in {target}"
     except Exception as e:
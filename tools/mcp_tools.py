@@ -7,6 +7,7 @@ import platform
 import shutil
 import asyncio
 
+import httpx
 from langchain_core.tools import tool
 from shared_console import console, is_tui_mode
 from config_manager import _get_qoze_base_dir
@@ -36,6 +37,18 @@ def _log(msg: str, style: str = "dim"):
         console.print(f"[{style}]{msg}[/{style}]")
 
 
+_CHROME_DEBUG_VERSION_URL = "http://127.0.0.1:9222/json/version"
+
+
+async def _chrome_debug_port_ready(client: httpx.AsyncClient) -> bool:
+    """检测 Chrome 远程调试端口是否可用（进程内 HTTP 请求，无需 fork curl）"""
+    try:
+        resp = await client.get(_CHROME_DEBUG_VERSION_URL)
+        return resp.is_success
+    except httpx.HTTPError:
+        return False
+
+
 def _get_chrome_path() -> str:
     """跨平台检测 Chrome/Chromium 可执行文件路径。
 
@@ -135,42 +148,39 @@ async def activate_mcp_server(server_name: str) -> str:
                 chrome_script = os.path.join(_get_qoze_base_dir(), "chrome-mcp.sh")
                 use_shell_script = True
 
-            # 检测 Chrome 远程调试端口
-            check = subprocess.run(
-                ["curl", "-s", "--max-time", "2", "http://127.0.0.1:9222/json/version"],
-                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
-            if check.returncode != 0:
-                _log("MCP: Chrome 未运行，正在自动启动...", "yellow")
-                # 尝试通过便捷脚本启动
-                if os.path.exists(chrome_script):
-                    if use_shell_script:
-                        subprocess.run(["bash", chrome_script, "start"],
-                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            # 检测 Chrome 远程调试端口（复用同一个 client 完成首次检测与后续就绪轮询）
+            async with httpx.AsyncClient(timeout=2.0, trust_env=False) as client:
+                if not await _chrome_debug_port_ready(client):
+                    _log("MCP: Chrome 未运行，正在自动启动...", "yellow")
+                    # 尝试通过便捷脚本启动
+                    if os.path.exists(chrome_script):
+                        if use_shell_script:
+                            script_cmd = ["bash", chrome_script, "start"]
+                        else:
+                            script_cmd = ["powershell", "-ExecutionPolicy", "Bypass",
+                                          "-File", chrome_script, "start"]
+                        # 异步等待脚本结束，不阻塞事件循环
+                        proc = await asyncio.create_subprocess_exec(
+                            *script_cmd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                        )
+                        await proc.wait()
                     else:
-                        subprocess.run(["powershell", "-ExecutionPolicy", "Bypass",
-                                        "-File", chrome_script, "start"],
-                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                else:
-                    # fallback: 跨平台直接启动 Chrome
-                    chrome_path = _get_chrome_path()
-                    subprocess.Popen(
-                        [chrome_path,
-                         "--remote-debugging-port=9222",
-                         f"--user-data-dir={os.path.expanduser('~')}/.qoze/chrome-mcp-profile",
-                         "--no-first-run", "--no-default-browser-check"],
-                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                    )
-                # 等待 Chrome 远程调试端口就绪
-                for _ in range(10):
-                    await asyncio.sleep(1)
-                    r = subprocess.run(
-                        ["curl", "-s", "--max-time", "2", "http://127.0.0.1:9222/json/version"],
-                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                    )
-                    if r.returncode == 0:
-                        _log("MCP: Chrome 独立实例已就绪", "green")
-                        break
+                        # fallback: 跨平台直接启动 Chrome
+                        chrome_path = _get_chrome_path()
+                        subprocess.Popen(
+                            [chrome_path,
+                             "--remote-debugging-port=9222",
+                             f"--user-data-dir={os.path.expanduser('~')}/.qoze/chrome-mcp-profile",
+                             "--no-first-run", "--no-default-browser-check"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                        )
+                    # 等待 Chrome 远程调试端口就绪（总计最多约 10 秒，短间隔轮询以便端口就绪后尽快返回）
+                    for _ in range(40):
+                        await asyncio.sleep(0.25)
+                        if await _chrome_debug_port_ready(client):
+                            _log("MCP: Chrome 独立实例已就绪", "green")
+                            break
 
         # 统一调用激活（无论 Chrome 是否已在运行）
         tools, msg = await mgr.activate_server(server_name)
@@ -8,13 +8,111 @@ from tavily import AsyncTavilyClient
 import config_manager
 from shared_console import console
 
-# 初始化 Tavily 客户端
-tavily_client = AsyncTavilyClient(api_key=config_manager.get_tavily_key())
+# Tavily 客户端: 首次搜索时创建, 之后所有调用 (主 Agent 与 subagent) 共用同一个实例和连接池
+_tavily_client = None
+
+
+def _get_tavily_client() -> AsyncTavilyClient:
+    global _tavily_client
+    if _tavily_client is None:
+        _tavily_client = AsyncTavilyClient(api_key=config_manager.get_tavily_key())
+    return _tavily_client
+
 
 # 定义颜色常量
 CYAN = "\033[36m"
 RESET = "\033[0m"
 
+_READ_URL_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+}
+
+# read_url 共用的 HTTP 客户端: 复用连接池, 连续读取 r.jina.ai 时免去重复的 TCP/TLS 握手
+_http_client = None
+_http_client_loop = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """返回绑定到当前事件循环的共享客户端, 循环变化或已关闭时重新创建"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _discard_http_client(_http_client, _http_client_loop)
+        _http_client = httpx.AsyncClient(timeout=15.0, headers=_READ_URL_HEADERS, follow_redirects=True)
+        _http_client_loop = loop
+    return _http_client
+
+
+def _discard_http_client(client, loop):
+    """关闭绑定到旧事件循环的客户端
+
+    连接池中的连接属于旧循环, 不能在当前循环上 aclose: 旧循环仍在运行 (其他线程) 时交给它关闭,
+    旧循环已停止或关闭时其传输层已无法使用, 只能释放引用。
+    """
+    if client is None or client.is_closed:
+        return
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+async def aclose_http_client():
+    """关闭 read_url 共用的 HTTP 客户端 (退出前调用)"""
+    global _http_client, _http_client_loop
+    client, loop = _http_client, _http_client_loop
+    _http_client = _http_client_loop = None
+    if client is None or client.is_closed:
+        return
+    if loop is asyncio.get_running_loop():
+        await client.aclose()
+    else:
+        _discard_http_client(client, loop)
+
+
+class _NullProgress:
+    """非交互终端或 console 静默 (TUI 模式) 时代替 Progress: 不启动刷新线程, 也不输出控制序列"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_task(self, *args, **kwargs):
+        return None
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+def _make_progress():
+    if console.quiet or not console.is_terminal:
+        return _NullProgress()
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        TimeElapsedColumn(),
+        console=console,
+        transient=False
+    )
+
+
+# read_url 返回给模型的最大字符数（避免token过多）
+_MAX_CONTENT_CHARS = 8000
+# 直接抓取时最多读取的 HTML 字符数: html2text 转换后通常远短于原文, 留足余量后再截断
+_MAX_HTML_CHARS = 1_000_000
+
+
+async def _read_text_capped(response: httpx.Response, max_chars: int) -> str:
+    """边下载边解码, 收集的文本超过 max_chars 后立即停止, 不再下载和解码剩余内容"""
+    parts = []
+    total = 0
+    async for chunk in response.aiter_text():
+        parts.append(chunk)
+        total += len(chunk)
+        if total > max_chars:
+            break
+    return "".join(parts)
+
 
 @tool
 async def tavily_search(query: str, max_results: int = 5) -> str:
@@ -34,17 +132,11 @@ async def tavily_search(query: str, max_results: int = 5) -> str:
 
     try:
         # print(f"\n🔍 正在搜索: {query}")
-        with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]{task.description}"),
-                TimeElapsedColumn(),
-                console=console,
-                transient=False
-        ) as progress:
+        with _make_progress() as progress:
             task = progress.add_task(f"[bold dim cyan]正在搜索: {query} [/bold dim cyan]",
                                      total=None)
             # 使用 Tavily 进行搜索
-            response = await tavily_client.search(
+            response = await _get_tavily_client().search(
                 query=query,
                 max_results=max_results,
                 include_answer=True,
@@ -102,25 +194,22 @@ async def read_url(url: str) -> str:
         or an error message if the request fails.
     """
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-    }
-
     async def _fetch_with_jina(client: httpx.AsyncClient) -> str:
         api_url = f"https://r.jina.ai/{url}"
-        jina_headers = dict(headers)
+        jina_headers = {}
         jina_key = config_manager.get_jina_key()
         if jina_key:
             jina_headers["Authorization"] = f"Bearer {jina_key}"
-        response = await client.get(api_url, headers=jina_headers, follow_redirects=True, timeout=10)
-        if response.status_code == 200:
-            return response.text
+        async with client.stream("GET", api_url, headers=jina_headers, timeout=10) as response:
+            if response.status_code == 200:
+                # 读取量会略超上限, 后续截断逻辑据此识别内容超长并追加提示
+                return await _read_text_capped(response, _MAX_CONTENT_CHARS)
         raise RuntimeError(f"Jina Reader API 返回错误: {response.status_code}")
 
     async def _fetch_with_direct(client: httpx.AsyncClient) -> str:
-        response = await client.get(url, headers=headers, follow_redirects=True, timeout=10)
-        response.raise_for_status()
-        html = response.text
+        async with client.stream("GET", url, timeout=10) as response:
+            response.raise_for_status()
+            html = await _read_text_capped(response, _MAX_HTML_CHARS)
         h = html2text.HTML2Text()
         h.ignore_links = False
         h.ignore_images = False
@@ -128,41 +217,34 @@ async def read_url(url: str) -> str:
         return h.handle(html)
 
     try:
-        with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]{task.description}"),
-                TimeElapsedColumn(),
-                console=console,
-                transient=False
-        ) as progress:
+        with _make_progress() as progress:
             task = progress.add_task(
                 f"[bold dim cyan]访问页面: {url[:66]}{'...' if len(url) > 66 else ''}[/bold dim cyan]", total=None)
 
-            async with httpx.AsyncClient(timeout=15.0) as client:
+            client = _get_http_client()
+            try:
+                markdown_content = await asyncio.wait_for(_fetch_with_jina(client), timeout=15)
+                source_info = "通过 Jina Reader API 解析"
+            except Exception as jina_err:
+                # Fallback: 直接请求目标 URL 并用 html2text 转换
                 try:
-                    markdown_content = await asyncio.wait_for(_fetch_with_jina(client), timeout=15)
-                    source_info = "通过 Jina Reader API 解析"
-                except Exception as jina_err:
-                    # Fallback: 直接请求目标 URL 并用 html2text 转换
-                    try:
-                        markdown_content = await asyncio.wait_for(_fetch_with_direct(client), timeout=15)
-                        source_info = f"直接抓取（Jina 失败: {jina_err}）"
-                    except Exception as direct_err:
-                        error_msg = f"❌ 网页解析失败: Jina 错误: {jina_err}; 直接抓取错误: {direct_err}"
-                        progress.update(task,
-                                        description=f"[bold red]✗ 阅读失败: {url[:66]}{'...' if len(url) > 66 else ''}{RESET}")
-                        return error_msg
-
-                # 限制输出长度（避免token过多）
-                max_length = 8000
-                if len(markdown_content) > max_length:
-                    markdown_content = markdown_content[:max_length] + "\n\n... (内容过长，已截断)"
-
-                result = f"# 网页内容解析\n\n**来源URL**: {url}\n\n**解析方式**: {source_info}\n\n---\n\n{markdown_content}"
-
-                progress.update(task,
-                                description=f"[bold green]✓[/bold green] [bold dim cyan] 阅读完成: {url[:66]}{'...' if len(url) > 66 else ''}[/bold dim cyan]")
-                return result
+                    markdown_content = await asyncio.wait_for(_fetch_with_direct(client), timeout=15)
+                    source_info = f"直接抓取（Jina 失败: {jina_err}）"
+                except Exception as direct_err:
+                    error_msg = f"❌ 网页解析失败: Jina 错误: {jina_err}; 直接抓取错误: {direct_err}"
+                    progress.update(task,
+                                    description=f"[bold red]✗ 阅读失败: {url[:66]}{'...' if len(url) > 66 else ''}{RESET}")
+                    return error_msg
+
+            # 限制输出长度（避免token过多）
+            if len(markdown_content) > _MAX_CONTENT_CHARS:
+                markdown_content = markdown_content[:_MAX_CONTENT_CHARS] + "\n\n... (内容过长，已截断)"
+
+            result = f"# 网页内容解析\n\n**来源URL**: {url}\n\n**解析方式**: {source_info}\n\n---\n\n{markdown_content}"
+
+            progress.update(task,
+                            description=f"[bold green]✓[/bold green] [bold dim cyan] 阅读完成: {url[:66]}{'...' if len(url) > 66 else ''}[/bold dim cyan]")
+            return result
 
     except Exception as e:
         error_msg = f"❌ 网页解析失败: {str(e)}"
@@ -2,6 +2,8 @@
 QozeCode Skills Tools - LLM 可调用的技能管理工具
 """
 
+import asyncio
+
 from langchain_core.tools import tool
 from skills.skill_manager import SkillManager
 from shared_console import console
@@ -21,8 +23,16 @@ def get_skill_manager() -> SkillManager:
     return _skill_manager
 
 
+def _activate_and_read(skill_manager: SkillManager, skill_name: str):
+    """激活技能并读取其内容 (skill.content 首次访问时读取 SKILL.md)；激活失败返回 None"""
+    skill = skill_manager.activate_skill(skill_name)
+    if not skill:
+        return None
+    return skill.content
+
+
 @tool
-def activate_skill(skill_name: str) -> str:
+async def activate_skill(skill_name: str) -> str:
     """
     激活指定的技能以获得专业化能力。
     
@@ -36,20 +46,21 @@ def activate_skill(skill_name: str) -> str:
         激活结果和技能内容
     """
     try:
-        skill_manager = get_skill_manager()
+        # 首次调用会扫描技能目录, 放到线程中执行, 避免阻塞事件循环上并发的其他工具
+        skill_manager = await asyncio.to_thread(get_skill_manager)
 
         # 检查技能是否存在
         if skill_name not in skill_manager.skills:
             available_skills = list(skill_manager.get_available_skills().keys())
             return f"[SKILL_NOT_FOUND] 技能 '{skill_name}' 不存在。\n可用技能: {', '.join(available_skills)}"
 
-        # 激活技能
-        skill = skill_manager.activate_skill(skill_name)
-        if not skill:
+        # 激活技能 (会写回技能配置文件) 并读取技能内容, 两者都涉及文件 IO, 一并放到线程中执行
+        content = await asyncio.to_thread(_activate_and_read, skill_manager, skill_name)
+        if content is None:
             return f"[SKILL_ACTIVATION_FAILED] 无法激活技能 '{skill_name}'"
 
         # 返回技能内容供 LLM 使用
-        return f"[SKILL_ACTIVATED] 技能 '{skill_name}' 已成功激活！\n\n{skill.content}"
+        return f"[SKILL_ACTIVATED] 技能 '{skill_name}' 已成功激活！\n\n{content}"
 
     except Exception as e:
         error_msg = f"[SKILL_ERROR] 激活技能时发生错误: {str(e)}"
@@ -81,15 +92,16 @@ def list_available_skills() -> str:
 
         result = "\n".join(skills_info)
 
-        # 同时显示在控制台
-        table = Table(title="Available Skills")
-        table.add_column("Skill Name", style="cyan", no_wrap=True)
-        table.add_column("Description", style="white")
+        # 同时显示在控制台（TUI 模式下 console 为 quiet，跳过 Table 构建与渲染）
+        if not console.quiet:
+            table = Table(title="Available Skills")
+            table.add_column("Skill Name", style="cyan", no_wrap=True)
+            table.add_column("Description", style="white")
 
-        for name, description in available_skills.items():
-            table.add_row(name, description)
+            for name, description in available_skills.items():
+                table.add_row(name, description)
 
-        console.print(table)
+            console.print(table)
 
         return result
 
@@ -100,7 +112,7 @@ def list_available_skills() -> str:
 
 
 @tool
-def deactivate_skill(skill_name: str) -> str:
+async def deactivate_skill(skill_name: str) -> str:
     """
     停用指定的技能。
     
@@ -113,12 +125,12 @@ def deactivate_skill(skill_name: str) -> str:
         停用结果
     """
     try:
-        skill_manager = get_skill_manager()
+        skill_manager = await asyncio.to_thread(get_skill_manager)
 
         if skill_name not in skill_manager.active_skills:
             return f"[SKILL_NOT_ACTIVE] 技能 '{skill_name}' 当前未激活"
 
-        skill_manager.deactivate_skill(skill_name)
+        await asyncio.to_thread(skill_manager.deactivate_skill, skill_name)
 
         console.print(f"[yellow]🔻 技能 '{skill_name}' 已停用[/yellow]")
         return f"[SKILL_DEACTIVATED] 技能 '{skill_name}' 已成功停用"
@@ -66,30 +66,11 @@ async def _get_subagent_system_prompt() -> str:
 
 
 def _load_rules() -> str:
-    """加载当前工作目录下 .qoze/rules/ 的自定义规则（与主 agent 一致）"""
+    """加载当前工作目录下 .qoze/rules/ 的自定义规则（与主 agent 共用同一实现及缓存）"""
     import os
-    current_dir = os.getcwd()
-    rules_dir = os.path.join(current_dir, '.qoze', 'rules')
-    if not os.path.isdir(rules_dir):
-        return ""
-
-    try:
-        rule_files = [f for f in os.listdir(rules_dir) if os.path.isfile(os.path.join(rules_dir, f))]
-        if not rule_files:
-            return ""
-
-        parts = ["\n## 当前自定义 agent 规则\n"]
-        for file_name in sorted(rule_files):
-            file_path = os.path.join(rules_dir, file_name)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-                parts.append(f"### {file_name}\n{file_content}\n")
-            except Exception:
-                pass
-        return "".join(parts)
-    except Exception:
-        return ""
+    from utils.system_prompt import load_qoze_rules
+    rules = load_qoze_rules(os.getcwd())
+    return f"\n{rules}" if rules else ""
 
 
 def _load_directory_tree() -> str:
@@ -289,7 +270,9 @@ def _build_subagent(model_with_tools):
                     name=tool_name
                 ))
             except Exception as e:
-                traceback.print_exc()
+                # 堆栈经 console 输出：TUI 模式下直写 stderr 会破坏界面，且 console 为 quiet 时跳过格式化
+                if not console.quiet:
+                    console.print(traceback.format_exc(), style="dim red", markup=False, highlight=False)
                 result.append(ToolMessage(
                     content=f"Tool '{tool_name}' error: {type(e).__name__}: {e}",
                     tool_call_id=tool_call["id"],
@@ -481,7 +464,8 @@ async def _stream_subagent(
         raise
 
     except Exception as e:
-        traceback.print_exc()
+        if not console.quiet:
+            console.print(traceback.format_exc(), style="dim red", markup=False, highlight=False)
         error_msg = f"❌ Subagent 执行失败: {type(e).__name__}: {e}"
         await cb({
             "type": "subagent_done",
@@ -571,5 +555,6 @@ async def dispatch_subagent(
     except asyncio.TimeoutError:
         return "⚠️ Subagent 执行超时，任务可能过于复杂。请尝试拆分为更小的子任务。"
     except Exception as e:
-        traceback.print_exc()
+        if not console.quiet:
+            console.print(traceback.format_exc(), style="dim red", markup=False, highlight=False)
         return f"❌ Subagent 执行失败: {type(e).__name__}: {e}"
@@ -15,6 +15,9 @@ LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__
 
 _LOG_ENABLED = os.environ.get("QOZE_DEBUG", "") != ""
 
+# 流式期间已完成的段落累计超过该字符数时冻结为独立 Static，之后每次刷新只重绘尾部
+_FREEZE_MIN_CHARS = 1024
+
 
 def _log(msg):
     if not _LOG_ENABLED:
@@ -88,6 +91,11 @@ class BotMessageWidget(Static):
         self._content_buffer = message.content or ""
         self._last_update = 0
         self._mounted = False
+        # 已冻结为独立 Static 的前缀长度及对应组件（仅流式期间存在，finalize 时移除）
+        self._frozen_len = 0
+        self._frozen_blocks = []
+        # 上次推送到 Static 时的 buffer 长度；buffer 只追加，长度未变即内容未变（如仅 thinking 更新触发的刷新）
+        self._last_pushed_len = -1
         _log(f"init: content_len={len(self._content_buffer)}")
 
     def compose(self) -> ComposeResult:
@@ -107,17 +115,48 @@ class BotMessageWidget(Static):
         self._apply_error_style()
 
     def _update_content_display(self):
+        if len(self._content_buffer) == self._last_pushed_len:
+            return
         try:
             content_static = self.query_one("#content-static", Static)
-            content_static.update(sanitize_display_text(self._content_buffer) if self._content_buffer else " ")
+            self._freeze_completed_blocks(content_static)
+            tail = self._content_buffer[self._frozen_len:]
+            content_static.update(sanitize_display_text(tail) if tail else " ")
+            self._last_pushed_len = len(self._content_buffer)
         except Exception as e:
             _log(f"_update_content_display: ERROR - {e}")
 
+    def _freeze_completed_blocks(self, content_static: Static):
+        """把尾部中已完成的段落（最后一个空行之前）冻结为独立 Static，避免每次刷新都重排整段长文本。
+
+        切分点取最后一个 "\n\n" 的第一个换行：冻结块不含该换行，尾部以它开头，
+        多个 Static 纵向拼接后与整段文本放在单个 Static 中逐行一致。
+        """
+        if content_static.has_class("hidden"):
+            return
+        cut = self._content_buffer.rfind("\n\n", self._frozen_len)
+        if cut - self._frozen_len < _FREEZE_MIN_CHARS:
+            return
+        block = AutoCopyStatic(sanitize_display_text(self._content_buffer[self._frozen_len:cut]))
+        content_static.parent.mount(block, before=content_static)
+        self._frozen_blocks.append(block)
+        self._frozen_len = cut + 1
+        _log(f"_freeze_completed_blocks: frozen_len={self._frozen_len}, blocks={len(self._frozen_blocks)}")
+
+    def _remove_frozen_blocks(self):
+        for block in self._frozen_blocks:
+            block.remove()
+        self._frozen_blocks.clear()
+        self._frozen_len = 0
+
     def watch_content(self, new_content: str):
         # 保护：reactive 挂载时初始值为空字符串，不应覆盖流式期间已设置的内容
         if not new_content and self._content_buffer:
             return
         self._content_buffer = new_content
+        # 整体替换内容后，已冻结的前缀和上次推送的长度都不再有效
+        self._remove_frozen_blocks()
+        self._last_pushed_len = -1
         if self._mounted:
             self._update_content_display()
 
@@ -141,6 +180,7 @@ class BotMessageWidget(Static):
             # 先更新 Markdown 内容，再切换显隐，减少中间帧的布局抖动
             content_md.update(sanitize_display_text(self._content_buffer) if self._content_buffer else " ")
             content_static.add_class("hidden")
+            self._remove_frozen_blocks()
             content_md.remove_class("hidden")
 
             # 触发布局刷新，确保高度重新计算
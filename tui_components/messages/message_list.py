@@ -193,6 +193,7 @@ class MessageList(ScrollableContainer):
         self._pending_tools: dict = {}
         self._tool_placeholders: dict = {}
         self._auto_scroll = True  # 是否自动跟随流式滚动
+        self._scroll_end_pending = False  # 已排队的滚动到底部请求，同一帧内只执行一次
         _log(f"init: tool_status_panel={tool_status_panel is not None}")
 
         self._stream_handler = MessageStreamHandler(
@@ -356,7 +357,7 @@ class MessageList(ScrollableContainer):
         """挂载组件，仅在 auto_scroll 时滚动到底部"""
         self.mount(widget)
         if self._auto_scroll:
-            self.call_after_refresh(self.scroll_end, animate=False)
+            self._request_scroll_end()
 
     def _update_widget(self, widget):
         """刷新组件（更新内容显示 + 重新计算布局）"""
@@ -373,10 +374,22 @@ class MessageList(ScrollableContainer):
         if not self._auto_scroll:
             return
         try:
-            self.call_after_refresh(self.scroll_end, animate=False)
+            self._request_scroll_end()
         except Exception:
             pass
 
+    def _request_scroll_end(self):
+        """在下一次刷新后滚动到底部；同一帧内的多次请求合并为一次 scroll_end"""
+        if self._scroll_end_pending:
+            return
+        self._scroll_end_pending = True
+        self.call_after_refresh(self._flush_scroll_end)
+
+    def _flush_scroll_end(self):
+        self._scroll_end_pending = False
+        if self._auto_scroll:
+            self.scroll_end(animate=False)
+
     def user_scrolled_up(self):
         """用户手动向上滚动，停止自动跟随"""
         self._auto_scroll = False
@@ -6,8 +6,10 @@ MessageStreamHandler - 参考 demo_tui_stream_output.py 的简洁实现
 thinking 内容通过独立的 ThinkingWidget 展示（可折叠），不再嵌入 BotMessageWidget。
 """
 import asyncio
+import functools
 import time
 import json
+import re
 import sys
 import os
 from typing import Callable, Optional, Dict, Set
@@ -23,6 +25,12 @@ LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__
 
 _LOG_ENABLED = os.environ.get("QOZE_DEBUG", "") != ""
 
+# 命令显示用: 控制字符 (换行、制表、ANSI ESC 等) 统一替换为空格, 保证单行展示
+_CONTROL_CHARS_TABLE = dict.fromkeys(range(32), " ")
+
+# str.splitlines 认定的全部行边界字符，用于只定位第一行
+_LINE_BREAK_RE = re.compile("[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
 
 def _log(msg):
     if not _LOG_ENABLED:
@@ -76,8 +84,9 @@ class MessageStreamHandler:
         self._last_update_time = 0
         self._accumulated_content = ""
         self._expecting_new_message = False
-        self._accumulated_ai_message = None
+        self._ai_tool_chunks = []  # 本轮携带 tool_calls 信息的 AI chunk，需要时才合并
         self._pending_update = False
+        self._deferred_flush_task = None
         self._need_new_bot_widget = False
         self._usage_by_message = {}  # 精确 token 用量: 消息 id → usage_metadata (同一条消息取最后一次快照)
 
@@ -93,8 +102,9 @@ class MessageStreamHandler:
         self._accumulated_thinking = ""
         self._accumulated_tool_calls_text = ""
         self._expecting_new_message = False
-        self._accumulated_ai_message = None
+        self._ai_tool_chunks = []
         self._pending_update = False
+        self._cancel_deferred_flush()
         self._need_new_bot_widget = False
         self._usage_by_message = {}  # 精确 token 用量: 消息 id → usage_metadata (同一条消息取最后一次快照)
 
@@ -233,33 +243,14 @@ class MessageStreamHandler:
             self._usage_by_message[msg_id] = usage_meta
             _log(f"usage chunk: key={msg_id} chunk={chunk_count} usage={usage_meta}")
 
-        thinking = self._extract_thinking(message_chunk)
-        content = self._extract_content(message_chunk)
+        thinking, content = self._extract_thinking_and_content(message_chunk)
 
-        if self._accumulated_ai_message is None:
-            self._accumulated_ai_message = message_chunk
-        else:
-            try:
-                self._accumulated_ai_message += message_chunk
-            except TypeError:
-                # 流中混入了不同类型的消息（AIMessageChunk vs AIMessage），
-                # 尝试手动合并关键字段，避免丢失已累积的 content/thinking
-                _log(f"Accumulation type mismatch: "
-                     f"{type(self._accumulated_ai_message).__name__} "
-                     f"+ {type(message_chunk).__name__}, manual merge")
-                # 将新 chunk 的 content 附加到旧消息上（如果旧消息是 str 类型）
-                old_content = getattr(self._accumulated_ai_message, 'content', '')
-                new_content = getattr(message_chunk, 'content', '')
-                if isinstance(old_content, str) and isinstance(new_content, str):
-                    combined = type(message_chunk)(content=old_content + new_content)
-                else:
-                    combined = message_chunk
-                # 保留新消息的 tool_calls（更完整）
-                if hasattr(combined, 'tool_calls') and hasattr(message_chunk, 'tool_calls'):
-                    combined.tool_calls = message_chunk.tool_calls
-                if hasattr(combined, 'additional_kwargs') and hasattr(message_chunk, 'additional_kwargs'):
-                    combined.additional_kwargs = message_chunk.additional_kwargs
-                self._accumulated_ai_message = combined
+        # 只有携带工具调用信息的 chunk 会改变合并后的 tool_calls；纯文本 chunk 不参与累积，
+        # 避免每个 chunk 都 += 一次、把已累积的 content 整体复制一遍（长回复下为 O(N²)）
+        has_tool_data = bool(getattr(message_chunk, "tool_call_chunks", None) or
+                             getattr(message_chunk, "tool_calls", None))
+        if has_tool_data:
+            self._ai_tool_chunks.append(message_chunk)
 
         await self._handle_ai_content(message_chunk, thinking, content)
 
@@ -280,12 +271,46 @@ class MessageStreamHandler:
                 self._thinking_widget = None
             self._expecting_new_message = True
 
-        if self._accumulated_ai_message.tool_calls:
-            self._update_tool_calls_from_accumulated()
+        if has_tool_data:
+            merged = self._merge_ai_tool_chunks()
+            if merged.tool_calls:
+                self._update_tool_calls_from_accumulated(merged)
 
-    def _update_tool_calls_from_accumulated(self):
+    def _merge_ai_tool_chunks(self):
+        """按需合并累积的工具调用 chunk，合并结果替换原列表，下次只需与新到达的 chunk 合并"""
+        if not self._ai_tool_chunks:
+            return None
+        if len(self._ai_tool_chunks) > 1:
+            self._ai_tool_chunks = [functools.reduce(self._add_ai_chunks, self._ai_tool_chunks)]
+        return self._ai_tool_chunks[0]
+
+    @staticmethod
+    def _add_ai_chunks(left, right):
+        try:
+            return left + right
+        except TypeError:
+            # 流中混入了不同类型的消息（AIMessageChunk vs AIMessage），
+            # 尝试手动合并关键字段，避免丢失已累积的 content/thinking
+            _log(f"Accumulation type mismatch: "
+                 f"{type(left).__name__} "
+                 f"+ {type(right).__name__}, manual merge")
+            # 将新 chunk 的 content 附加到旧消息上（如果旧消息是 str 类型）
+            old_content = getattr(left, 'content', '')
+            new_content = getattr(right, 'content', '')
+            if isinstance(old_content, str) and isinstance(new_content, str):
+                combined = type(right)(content=old_content + new_content)
+            else:
+                combined = right
+            # 保留新消息的 tool_calls（更完整）
+            if hasattr(combined, 'tool_calls') and hasattr(right, 'tool_calls'):
+                combined.tool_calls = right.tool_calls
+            if hasattr(combined, 'additional_kwargs') and hasattr(right, 'additional_kwargs'):
+                combined.additional_kwargs = right.additional_kwargs
+            return combined
+
+    def _update_tool_calls_from_accumulated(self, accumulated):
         """从累积的 AI 消息中更新 tool_calls 信息，并立即显示新的 tool_calls"""
-        for tool_call in self._accumulated_ai_message.tool_calls:
+        for tool_call in accumulated.tool_calls:
             tool_call_id = tool_call.get("id", "")
             if not tool_call_id:
                 continue
@@ -378,10 +403,9 @@ class MessageStreamHandler:
         matched_id = tc_id  # 记录实际匹配到的 tool_id
 
         if not tool_info and self._active_tools:
-            _id, _info = list(self._active_tools.items())[-1]
-            tool_info = _info
+            # dict 保持插入顺序，popitem() 直接弹出最后注册的工具，无需构建完整列表
+            _id, tool_info = self._active_tools.popitem()
             matched_id = _id  # 使用回退匹配到的 ID
-            self._active_tools.pop(_id)
             _log(f"Using last active tool: {_id}")
 
         if not tool_info:
@@ -404,7 +428,7 @@ class MessageStreamHandler:
 
         self._expecting_new_message = True
         self._need_new_bot_widget = True
-        self._accumulated_ai_message = None
+        self._ai_tool_chunks = []
 
     async def _display_pending_tool_calls(self):
         """显示待处理的 tool_calls（更新显示名称如果有变化）"""
@@ -421,9 +445,10 @@ class MessageStreamHandler:
                 tool_info["display_name"] = new_display_name
                 # _log(f"Updated display_name for {tool_id}: {new_display_name}")
         # 更新 tool_calls 文本用于 token 估算
-        if self._accumulated_ai_message and self._accumulated_ai_message.tool_calls:
+        accumulated = self._merge_ai_tool_chunks()
+        if accumulated and accumulated.tool_calls:
             parts = []
-            for tc in self._accumulated_ai_message.tool_calls:
+            for tc in accumulated.tool_calls:
                 parts.append(json.dumps(tc, ensure_ascii=False))
             self._accumulated_tool_calls_text = "\n".join(parts)
 
@@ -433,7 +458,7 @@ class MessageStreamHandler:
         if tool_name == "execute_command":
             cmd = tool_args.get("command", "")
             if cmd:
-                short_cmd = cmd[:120] + ("..." if len(cmd) > 120 else "")
+                short_cmd = cmd[:120].translate(_CONTROL_CHARS_TABLE) + ("..." if len(cmd) > 120 else "")
                 return f"command: {short_cmd}"
             return "command: (empty)"
         elif tool_name == "read_file":
@@ -484,7 +509,7 @@ class MessageStreamHandler:
             return f"read lark: {url[:40]}" if url else "read lark: (empty)"
         else:
             if tool_args:
-                first_key = list(tool_args.keys())[0]
+                first_key = next(iter(tool_args))
                 first_val = str(tool_args[first_key])[:40]
                 return f"{tool_name}: {first_key}={first_val}..."
             return f"{tool_name}"
@@ -515,7 +540,7 @@ class MessageStreamHandler:
                 self.on_bot_created(self.current_bot_message)
                 self._expecting_new_message = False
                 self._need_new_bot_widget = False
-                self._last_update_time = time.time()
+                self._last_update_time = time.monotonic()
                 _log("Created new BotMessageWidget")
 
             self.current_bot_message.append_content(content)
@@ -551,21 +576,39 @@ class MessageStreamHandler:
             # 纯 tool_calls 场景，不创建空 widget
             return
 
-        current_time = time.time()
-        if current_time - self._last_update_time > self.UPDATE_INTERVAL:
+        elapsed = time.monotonic() - self._last_update_time
+        if elapsed > self.UPDATE_INTERVAL:
             await self._flush_update()
         else:
             self._pending_update = True
+            # 节流期内到达的 chunk 合并到一次延迟刷新中；否则模型停顿时最后几个 chunk 要等到下一个 chunk 才显示
+            if self._deferred_flush_task is None:
+                self._deferred_flush_task = asyncio.create_task(
+                    self._deferred_flush(self.UPDATE_INTERVAL - elapsed)
+                )
+
+    async def _deferred_flush(self, delay: float):
+        await asyncio.sleep(delay)
+        self._deferred_flush_task = None
+        if self._pending_update:
+            await self._flush_update()
+
+    def _cancel_deferred_flush(self):
+        task = self._deferred_flush_task
+        self._deferred_flush_task = None
+        if task is not None and not task.done():
+            task.cancel()
 
     async def _flush_update(self):
         """刷新 UI 更新"""
+        self._cancel_deferred_flush()
         if self.current_bot_message:
             self.on_bot_updated(self.current_bot_message)
         self._pending_update = False
-        self._last_update_time = time.time()
+        self._last_update_time = time.monotonic()
         # 实时回调当前 token 估算，按 TOKEN_UPDATE_INTERVAL 节流避免过于频繁
         if self.on_stream_progress:
-            now = time.time()
+            now = time.monotonic()
             if now - self._last_token_update_time > self.TOKEN_UPDATE_INTERVAL:
                 estimated = self._estimate_total_tokens()
                 if estimated > 0:
@@ -574,53 +617,56 @@ class MessageStreamHandler:
         # 让出事件循环，确保 UI 能立即渲染
         await asyncio.sleep(0)
 
-    def _extract_thinking(self, msg) -> str:
-        """从消息中提取 thinking/reasoning 内容"""
+    def _extract_thinking_and_content(self, msg):
+        """从消息中提取 (thinking/reasoning, content)
+
+        content 为 str 时（OpenAI 兼容接口的常见情况）直接取用，不再逐项扫描；
+        为 list 时只遍历一遍，同时收集 text 与 reasoning 类条目。
+        """
         thinking = ""
-        if hasattr(msg, "additional_kwargs") and msg.additional_kwargs:
-            for key in ["reasoning_content", "thinking", "thought", "reasoning"]:
-                if key in msg.additional_kwargs:
-                    val = msg.additional_kwargs[key]
+        content = ""
+        # 单次 getattr 取代 hasattr + 属性访问
+        additional_kwargs = getattr(msg, "additional_kwargs", None)
+        if additional_kwargs:
+            for key in ("reasoning_content", "thinking", "thought", "reasoning"):
+                if key in additional_kwargs:
+                    val = additional_kwargs[key]
                     if isinstance(val, str):
                         thinking += val
                     elif isinstance(val, dict):
                         thinking += val.get("text", "")
-        if hasattr(msg, "content") and isinstance(msg.content, list):
-            for item in msg.content:
-                if isinstance(item, dict):
-                    item_type = item.get("type", "")
-                    if item_type == "reasoning_content":
-                        rc = item.get("reasoning_content", {})
-                        if isinstance(rc, dict):
-                            thinking += rc.get("text", "")
-                        else:
-                            thinking += str(rc)
-                    elif item_type == "thinking":
-                        thinking += item.get("thinking", "")
-                    elif item_type == "reasoning":
-                        thinking += item.get("text", "") or item.get("reasoning", "")
-        if hasattr(msg, "reasoning_content") and msg.reasoning_content:
-            if isinstance(msg.reasoning_content, str):
-                thinking += msg.reasoning_content
-        return thinking
-
-    def _extract_content(self, msg) -> str:
-        """从消息中提取 content 内容"""
-        content = ""
-        if hasattr(msg, "content"):
-            if isinstance(msg.content, str):
-                content = msg.content
-            elif isinstance(msg.content, list):
-                for item in msg.content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        content += item.get("text", "")
-        return content
+        msg_content = getattr(msg, "content", None)
+        if isinstance(msg_content, str):
+            content = msg_content
+        elif isinstance(msg_content, list):
+            for item in msg_content:
+                if not isinstance(item, dict):
+                    continue
+                item_type = item.get("type", "")
+                if item_type == "text":
+                    content += item.get("text", "")
+                elif item_type == "reasoning_content":
+                    rc = item.get("reasoning_content", {})
+                    if isinstance(rc, dict):
+                        thinking += rc.get("text", "")
+                    else:
+                        thinking += str(rc)
+                elif item_type == "thinking":
+                    thinking += item.get("thinking", "")
+                elif item_type == "reasoning":
+                    thinking += item.get("text", "") or item.get("reasoning", "")
+        reasoning_content = getattr(msg, "reasoning_content", None)
+        if reasoning_content and isinstance(reasoning_content, str):
+            thinking += reasoning_content
+        return thinking, content
 
     def _is_error(self, result) -> bool:
         """检查结果是否包含错误 - 参考配色方案：识别 [RUN_FAILED]、[COMPLETED] 非零退出码等标记"""
         result_content = getattr(result, "content", "")
         if isinstance(result_content, str):
-            first_line = result_content.splitlines()[0] if result_content else ""
+            # 只取第一行判断，无需把可能很长的工具输出整体 splitlines 成列表
+            line_break = _LINE_BREAK_RE.search(result_content)
+            first_line = result_content[:line_break.start()] if line_break else result_content
             # 错误标记：[RUN_FAILED]、Error:、非零退出码、包含 ❌ 但不属于特定成功标记的情况
             is_err = (
                     first_line.startswith("[RUN_FAILED]") or
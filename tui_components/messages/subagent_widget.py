@@ -17,7 +17,7 @@ from textual.widgets import Static
 from textual.reactive import reactive
 
 from .auto_copy_widgets import AutoCopyStatic, AutoCopyMarkdown
-from ..tui_constants import SPINNER_FRAMES
+from ..tui_constants import SPINNER_FRAMES, SPINNER_FRAME_COUNT
 
 LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".qoze", "stream_debug.log")
 
@@ -138,7 +138,7 @@ class SubagentWidget(Static):
         if self._is_done:
             return f"✓ {arrow} Subagent · {clean}"
         else:
-            frame = SPINNER_FRAMES[self._spinner_frame % len(SPINNER_FRAMES)]
+            frame = SPINNER_FRAMES[self._spinner_frame % SPINNER_FRAME_COUNT]
             return f"{frame} {arrow} Subagent · {clean}"
 
     def _update_header(self):
@@ -151,7 +151,7 @@ class SubagentWidget(Static):
     def _on_tick(self):
         if self._is_done:
             return
-        self._spinner_frame = (self._spinner_frame + 1) % len(SPINNER_FRAMES)
+        self._spinner_frame = (self._spinner_frame + 1) % SPINNER_FRAME_COUNT
         self._update_header()
 
     def _start_timer(self):
@@ -4,9 +4,9 @@ from textual.widgets import Static
 from textual.reactive import reactive
 from textual.app import ComposeResult
 from typing import Dict
-from datetime import datetime
+import time
 
-from ..tui_constants import SPINNER_FRAMES
+from ..tui_constants import SPINNER_FRAMES, SPINNER_FRAME_COUNT
 
 
 class RunningToolItem(Static):
@@ -25,27 +25,32 @@ class RunningToolItem(Static):
 
     def __init__(self, tool_id: str, display_text: str, **kwargs):
         self.tool_id = tool_id
-        self._start_time = datetime.now()
+        # 单调时钟：每 100ms 刷新只需一次浮点减法，且不受系统校时影响
+        self._start_time = time.monotonic()
         self._timer = None
+        self._short_text = self._truncate(display_text)
         super().__init__(**kwargs)
         self.display_text = display_text
 
+    @staticmethod
+    def _truncate(text: str) -> str:
+        # 限制显示文本前50个字符
+        return text[:47] + "..." if len(text) > 50 else text
+
     def compose(self) -> ComposeResult:
         yield Static(self._render_text())
 
     def _render_text(self) -> str:
-        elapsed = (datetime.now() - self._start_time).total_seconds()
+        elapsed = time.monotonic() - self._start_time
         m, s = divmod(int(elapsed), 60)
         elapsed_str = f"{m:02d}:{s:02d}"
-        # 限制显示文本前60个字符
-        text = self.display_text
-        if len(text) > 50:
-            text = text[:47] + "..."
-        frame = SPINNER_FRAMES[int(elapsed * 10) % len(SPINNER_FRAMES)]
-        return f"{frame} {text} {elapsed_str}"
+        frame = SPINNER_FRAMES[int(elapsed * 10) % SPINNER_FRAME_COUNT]
+        return f"{frame} {self._short_text} {elapsed_str}"
 
     def watch_display_text(self, new_text: str):
         """当 display_text 变化时更新"""
+        # 截断后的显示文本只在 display_text 变化时计算一次，而不是每 100ms 渲染时重算
+        self._short_text = self._truncate(new_text)
         self._update()
 
     def _update(self):
@@ -65,7 +70,7 @@ class RunningToolItem(Static):
             self._timer = None
 
     def get_elapsed_time(self) -> float:
-        return (datetime.now() - self._start_time).total_seconds()
+        return time.monotonic() - self._start_time
 
 
 class ToolStatusPanel(Vertical):
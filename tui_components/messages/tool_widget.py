@@ -3,10 +3,10 @@ from textual.widgets import Static
 from .auto_copy_widgets import AutoCopyStatic
 from textual.reactive import reactive
 from textual.app import ComposeResult
-from datetime import datetime
+import time
 
 from .types import ToolMessage, ToolStatus
-from ..tui_constants import SPINNER_FRAMES
+from ..tui_constants import SPINNER_FRAMES, SPINNER_FRAME_COUNT
 
 
 class ToolMessageWidget(Static):
@@ -45,7 +45,7 @@ class ToolMessageWidget(Static):
     
     def __init__(self, message: ToolMessage, **kwargs):
         # 初始化所有本地属性（在调用父类之前）
-        self._start_time = datetime.now()
+        self._start_time = time.monotonic()  # 单调时钟，tick 中只需一次浮点减法
         self._elapsed_time = 0.0
         self.message = message
         self._timer = None
@@ -70,7 +70,7 @@ class ToolMessageWidget(Static):
     def _render_text(self) -> str:
         """渲染当前状态的文本"""
         if self.status == ToolStatus.RUNNING:
-            frame = SPINNER_FRAMES[self.spinner_frame % len(SPINNER_FRAMES)]
+            frame = SPINNER_FRAMES[self.spinner_frame % SPINNER_FRAME_COUNT]
             return f"{frame} {self.display_text} {self.elapsed_str}"
         elif self.status == ToolStatus.SUCCESS:
             elapsed = f" in {self._elapsed_time:.2f}s" if self._elapsed_time > 0 else ""
@@ -93,12 +93,13 @@ class ToolMessageWidget(Static):
         """定时更新 - 更新时间和 spinner 帧"""
         if self.status == ToolStatus.RUNNING:
             # 计算经过时间
-            elapsed = (datetime.now() - self._start_time).total_seconds()
+            elapsed = time.monotonic() - self._start_time
             m, s = divmod(int(elapsed), 60)
             self.elapsed_str = f"{m:02d}:{s:02d}"
             
             # 更新 spinner 帧（每 tick 前进一帧）
-            self.spinner_frame = (self.spinner_frame + 1) % len(SPINNER_FRAMES)
+            # elapsed_str 不单独触发重绘，由 spinner_frame 的变化统一刷新，保证每 tick 只渲染一次
+            self.spinner_frame = (self.spinner_frame + 1) % SPINNER_FRAME_COUNT
     
     def _start_timer(self):
         """启动定时器 - 100ms 更新一次"""
@@ -122,11 +123,11 @@ class ToolMessageWidget(Static):
         elif new_status == ToolStatus.SUCCESS:
             self.add_class("success")
             self._stop_timer()
-            self._elapsed_time = (datetime.now() - self._start_time).total_seconds()
+            self._elapsed_time = time.monotonic() - self._start_time
         elif new_status == ToolStatus.ERROR:
             self.add_class("error")
             self._stop_timer()
-            self._elapsed_time = (datetime.now() - self._start_time).total_seconds()
+            self._elapsed_time = time.monotonic() - self._start_time
         
         # 更新显示
         self._update_display()
@@ -135,11 +136,6 @@ class ToolMessageWidget(Static):
         """显示文本变化时"""
         self._update_display()
     
-    def watch_elapsed_str(self, new_str: str):
-        """时间字符串变化时"""
-        if self.status == ToolStatus.RUNNING:
-            self._update_display()
-    
     def watch_spinner_frame(self, new_frame: int):
         """spinner 帧变化时"""
         if self.status == ToolStatus.RUNNING:
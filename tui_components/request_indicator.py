@@ -4,6 +4,11 @@ from rich.text import Text
 from textual.widgets import Static
 from .tui_constants import SPINNER_FRAMES
 
+# 每一帧的固定前缀预先拼好, 刷新时只需拼接时间并直接构造 Text, 无需每 100ms 重新解析 markup
+_FRAME_PREFIXES = tuple(f"{frame} Processing request... " for frame in SPINNER_FRAMES)
+_INDICATOR_STYLE = "bold cyan"
+
+
 class RequestIndicator(Static):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -17,7 +22,8 @@ class RequestIndicator(Static):
         self.remove_class("hidden")
         if self.update_timer:
             self.update_timer.stop()
-        self.update_timer = self.set_timer(0.1, self._update_display)
+        # 单个周期定时器, 取代每帧重新 set_timer 的自调度方式
+        self.update_timer = self.set_interval(0.1, self._update_display)
 
     def stop_request(self):
         self.is_active = False
@@ -31,10 +37,7 @@ class RequestIndicator(Static):
         if not self.is_active or not self.start_time:
             return
         elapsed = time.time() - self.start_time
-        frame = SPINNER_FRAMES[int(elapsed * 10) % len(SPINNER_FRAMES)]
-        total_seconds = int(elapsed)
-        time_str = f"{total_seconds // 3600:02d}:{(total_seconds % 3600) // 60:02d}:{total_seconds % 60:02d}"
-        content = f"[bold cyan]{frame} Processing request... {time_str}[/]"
-        self.update(Text.from_markup(content))
-        if self.is_active:
-            self.update_timer = self.set_timer(0.1, self._update_display)
+        prefix = _FRAME_PREFIXES[int(elapsed * 10) % len(_FRAME_PREFIXES)]
+        minutes, seconds = divmod(int(elapsed), 60)
+        hours, minutes = divmod(minutes, 60)
+        self.update(Text(f"{prefix}{hours:02d}:{minutes:02d}:{seconds:02d}", style=_INDICATOR_STYLE))
@@ -6,6 +6,9 @@ from textual.widgets import Static
 import qoze_code_agent
 from enums import supports_vision, ModelType
 
+# 与 qoze_code_agent.get_image_files 支持的图片格式一致
+_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp'})
+
 
 # --- Async Git Helpers ---
 async def run_async_cmd(args, timeout=2.0):
@@ -48,6 +51,10 @@ class Sidebar(Static):
         self.model_name = model_name
         self.provider = provider
         self.model_type = model_type
+        # 远程地址/分支缓存: 仅在 .git/HEAD 或 .git/config 变化时重新调用 git
+        self._git_meta_key = None
+        self._repo_url = "local"
+        self._branch = None
         super().__init__(*args, **kwargs)
 
     async def on_mount(self):
@@ -56,11 +63,45 @@ class Sidebar(Static):
         # Scheduled update (Textual handles async callbacks correctly)
         self.set_interval(5, self.update_info)
 
+    @staticmethod
+    def _scan_images(image_folder):
+        """一次 scandir 返回 [(图片路径, mtime)]
+
+        不按目录 mtime 缓存: 原地覆盖同名图片不会更新目录 mtime, 缓存会把未发送的新图显示为已发送;
+        该目录通常只有少量文件, 每次刷新直接扫描即可。
+        """
+        entries = []
+        try:
+            with os.scandir(image_folder) as it:
+                for entry in it:
+                    # 与 get_image_files 的筛选规则保持一致
+                    if os.path.splitext(entry.name.lower())[1] in _IMAGE_EXTENSIONS and entry.is_file():
+                        entries.append((entry.path, entry.stat().st_mtime))
+        except OSError:
+            return []
+        return entries
+
+    @staticmethod
+    def _read_git_meta_key(cwd):
+        """.git/HEAD 与 .git/config 的 mtime; 切换分支、修改 remote 都会更新它们。不在仓库根目录时返回 None"""
+        try:
+            return cwd, os.stat(".git/HEAD").st_mtime_ns, os.stat(".git/config").st_mtime_ns
+        except OSError:
+            return None
+
     async def update_info(self):
         cwd = os.getcwd()
-        repo_url = await get_git_info()
-        modified = await get_modified_files()
-        branch = await get_git_branch()
+        # git status 反映工作区改动, 无法用 mtime 判断, 每次都需要执行
+        meta_key = self._read_git_meta_key(cwd)
+        if meta_key is None or meta_key != self._git_meta_key:
+            # 三个 git 子进程互不依赖, 并发执行, 耗时取最慢的一个而非三者之和
+            modified, self._repo_url, self._branch = await asyncio.gather(
+                get_modified_files(), get_git_info(), get_git_branch()
+            )
+            self._git_meta_key = meta_key
+        else:
+            modified = await get_modified_files()
+        repo_url, branch = self._repo_url, self._branch
 
         text = Text()
         text.append("\n项目信息\n", style="bold #7aa2f7 underline")
@@ -79,25 +120,15 @@ class Sidebar(Static):
 
         # 实时检测图片数量
         image_folder = ".qoze/image"
-        img_count = 0
-        if os.path.exists(image_folder):
-            try:
-                img_files = qoze_code_agent.get_image_files(image_folder)
-                img_count = len(img_files)
-            except Exception:
-                pass
+        try:
+            img_entries = self._scan_images(image_folder)
+        except Exception:
+            img_entries = []
+        img_count = len(img_entries)
 
         if img_count > 0:
             sent_imgs = qoze_code_agent.conversation_state.get("sent_images", {})
-            new_count = 0
-            if os.path.exists(image_folder):
-                try:
-                    for f in qoze_code_agent.get_image_files(image_folder):
-                        mtime = os.path.getmtime(f)
-                        if f not in sent_imgs or sent_imgs[f] != mtime:
-                            new_count += 1
-                except:
-                    new_count = img_count
+            new_count = sum(1 for f, mtime in img_entries if sent_imgs.get(f) != mtime)
             text.append("图片上下文: ", style="#a9b1d6")
             if new_count > 0:
                 text.append(f"{img_count} 张 ({new_count} 新)\n", style="bold yellow")
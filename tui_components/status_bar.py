@@ -2,6 +2,10 @@
 from rich.text import Text
 from textual.widgets import Static
 
+# 快捷键提示固定不变
+_SHORTCUTS = "输入 line | Ctrl+N:录音笔记 | Ctrl+Q:语音输入 | Ctrl+C:终止 | Ctrl+D:提交"
+_IDLE_TEXT = f" {_SHORTCUTS}"
+
 
 class StatusBar(Static):
     def __init__(self, model_name="Unknown"):
@@ -11,6 +15,9 @@ class StatusBar(Static):
         self.state_style = None
         self.token_count = 0
         self.tiktoken_available = False
+        # render 会在每次 refresh 和布局重排时调用；显示内容不变时复用上次构建的 Text
+        self._render_key = None
+        self._rendered = None
 
     def update_state(self, state, style=None):
         self.state_desc = state
@@ -37,24 +44,28 @@ class StatusBar(Static):
         else:
             token_str = str(count)
 
-        # 构建状态栏，逐段精确控制样式
-        shortcuts = "输入 line | Ctrl+N:录音笔记 | Ctrl+Q:语音输入 | Ctrl+C:终止 | Ctrl+D:提交"
+        show_tokens = self.tiktoken_available and count > 0
+        key = (self.state_desc, self.state_style, token_str if show_tokens else None)
+        if key == self._render_key:
+            return self._rendered
 
+        # 构建状态栏，逐段精确控制样式
         if self.state_desc == "Idle":
-            left = f" {shortcuts}"
-            result = Text(left, style="dim")
+            result = Text(_IDLE_TEXT, style="dim")
 
         elif self.state_style:
             result = Text(f" ", style="dim")
             result.append(f"{self.state_desc} | ", style=self.state_style)
-            result.append(shortcuts, style="dim")
+            result.append(_SHORTCUTS, style="dim")
 
         else:
-            left = f" {self.state_desc} | {shortcuts}"
+            left = f" {self.state_desc} | {_SHORTCUTS}"
             result = Text(left, style="dim")
 
         # 只有 tiktoken 可用且 token_count > 0 时才显示精确的 Context tokens
-        if self.tiktoken_available and count > 0:
+        if show_tokens:
             result.append(" " * 5)
             result.append(f"Context: {token_str} tokens", style="dim")
+        self._render_key = key
+        self._rendered = result
         return result
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
-SPINNER_FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+SPINNER_FRAMES = ("⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏")
+SPINNER_FRAME_COUNT = len(SPINNER_FRAMES)
 
 CSS = """
     Screen { color: #a9b1d6; }
@@ -1,10 +1,13 @@
+import codecs
+import locale
+import os
 import subprocess
-import time
-from typing import Optional
 
-from rich.panel import Panel
 from shared_console import console
 
+# 每次从管道读取的最大字节数
+_READ_CHUNK_SIZE = 64 * 1024
+
 
 def run_command(command: str) -> str:
     """
@@ -18,38 +21,40 @@ def run_command(command: str) -> str:
             shell=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
         )
 
-        # start_time = time.time()
-        output_lines = []
+        # 原始字节累积在 bytearray 中，结束时一次性解码为返回值；逐行解码只用于控制台实时输出
+        output_bytes = bytearray()
+
+        # 按块读取原始字节后整块解码，再切分行；避免文本模式下逐行 readline 的调用开销
+        # 编码与文本模式 (text=True) 保持一致，增量解码器处理跨块的多字节字符
+        encoding = locale.getpreferredencoding(False)
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        fd = process.stdout.fileno()
+        pending = ""
 
         # 流式读取输出
         while True:
-            if process.stdout is None:
-                break
-
-            line = process.stdout.readline()
-            if line:
-                output_lines.append(line)
+            chunk = os.read(fd, _READ_CHUNK_SIZE)
+            output_bytes += chunk
+            pending += decoder.decode(chunk, final=not chunk)
+            # 末尾的 \r 可能与下一块开头的 \n 组成 \r\n，留到下一轮再切分
+            if chunk and pending.endswith("\r"):
+                continue
+            # 与文本模式的通用换行一致：\r\n 和单独的 \r 都视为换行
+            *lines, pending = pending.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            for line in lines:
                 console.print(line.rstrip())
-
-            # 进程结束
-            if line == "" and process.poll() is not None:
+            # 进程关闭输出 (EOF)
+            if not chunk:
                 break
 
-            # # 超时处理
-            # if time.time() - start_time > timeout:
-            #     try:
-            #         process.kill()
-            #     except Exception:
-            #         pass
-            #     output_lines.append(f"\n⚠️ 命令执行超时 ({timeout}秒)，进程已终止。")
-            #     break
-
-        exit_code: Optional[int] = process.poll()
-        full_output = "".join(output_lines)
+        if pending:
+            console.print(pending.rstrip())
+
+        process.stdout.close()
+        process.wait()
+        full_output = output_bytes.decode(encoding, errors="replace").replace("\r\n", "\n").replace("\r", "\n")
 
         return full_output
 
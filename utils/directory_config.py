@@ -5,8 +5,10 @@
 定义在获取项目目录结构时需要排除的目录和文件
 """
 
-# 需要排除的目录列表
-EXCLUDE_DIRECTORIES = [
+import fnmatch
+
+# 需要排除的目录列表（各技术栈分组之间有重复项，按首次出现的顺序去重）
+EXCLUDE_DIRECTORIES = list(dict.fromkeys([
     # 构建产物和输出目录
     'dist', 'build', 'target', 'out', 'output', 'bin', 'obj',
     'release', 'debug', 'Release', 'Debug',
@@ -68,7 +70,12 @@ EXCLUDE_DIRECTORIES = [
     # 其他常见排除项
     '.sass-cache', '.webpack', 'webpack-stats.json',
     'storybook-static', '.storybook-out'
-]
+]))
+
+# 精确名称与通配模式分开索引：精确名称用集合 O(1) 判断，只有少量通配模式才需要 fnmatch
+# 两者原地更新（见 add_custom_exclude_dir / remove_exclude_dir），导入方持有的引用始终有效
+EXCLUDE_NAMES = {name for name in EXCLUDE_DIRECTORIES if '*' not in name}
+EXCLUDE_GLOBS = [name for name in EXCLUDE_DIRECTORIES if '*' in name]
 
 # 目录扫描配置
 DIRECTORY_SCAN_CONFIG = {
@@ -97,13 +104,30 @@ def get_scan_config():
     return DIRECTORY_SCAN_CONFIG.copy()
 
 
+def is_excluded_name(name):
+    """判断文件/目录名是否命中排除列表（精确名称或通配模式）"""
+    if name in EXCLUDE_NAMES:
+        return True
+    return any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDE_GLOBS)
+
+
 def add_custom_exclude_dir(directory):
     """添加自定义排除目录"""
-    if directory not in EXCLUDE_DIRECTORIES:
-        EXCLUDE_DIRECTORIES.append(directory)
+    if directory in EXCLUDE_NAMES or directory in EXCLUDE_GLOBS:
+        return
+    EXCLUDE_DIRECTORIES.append(directory)
+    if '*' in directory:
+        EXCLUDE_GLOBS.append(directory)
+    else:
+        EXCLUDE_NAMES.add(directory)
 
 
 def remove_exclude_dir(directory):
     """移除排除目录"""
-    if directory in EXCLUDE_DIRECTORIES:
-        EXCLUDE_DIRECTORIES.remove(directory)
\ No newline at end of file
+    if directory in EXCLUDE_NAMES:
+        EXCLUDE_NAMES.discard(directory)
+    elif directory in EXCLUDE_GLOBS:
+        EXCLUDE_GLOBS.remove(directory)
+    else:
+        return
+    EXCLUDE_DIRECTORIES.remove(directory)
\ No newline at end of file
@@ -5,164 +5,118 @@
 """
 
 import os
-import platform
-import subprocess
-from utils.directory_config import EXCLUDE_DIRECTORIES
-
-# def get_directory_tree(current_dir=None):
-#     """
-#     获取当前目录树结构（智能限制深度和长度）
-#
-#     Args:
-#         current_dir: 目标目录，默认为当前工作目录
-#
-#     Returns:
-#         str: 格式化的目录树结构字符串
-#     """
-#     if current_dir is None:
-#         current_dir = os.getcwd()
-#
-#     try:
-#         # 智能判断目录深度：根据当前目录路径决定扫描深度
-#         path_depth = len(current_dir.split(os.sep))
-#         if path_depth <= 3:  # 接近根目录
-#             max_depth = 3
-#         elif path_depth <= 5:  # 中等深度
-#             max_depth = 4
-#         else:  # 深层目录
-#             max_depth = 5
-#
-#         # 设置最大输出长度限制（约2000个字符，避免token溢出）
-#         MAX_TREE_LENGTH = 3000
-#
-#         system_info = platform.system()
-#
-#         if system_info == "Windows":
-#             # Windows 使用 tree 命令，限制深度
-#             tree_result = subprocess.run(['tree', '/F', '/A', f'/L:{max_depth}'],
-#                                          capture_output=True, text=True, cwd=current_dir, timeout=10)
-#         else:
-#             # Unix-like 系统使用 tree 命令，如果没有则使用 find
-#             try:
-#                 # 使用 -I 参数排除指定目录，限制深度
-#                 exclude_pattern = '|'.join(EXCLUDE_DIRECTORIES)
-#                 tree_result = subprocess.run(['tree', '-L', str(max_depth), '-a', '-I', exclude_pattern],
-#                                              capture_output=True, text=True, cwd=current_dir, timeout=10)
-#             except FileNotFoundError:
-#                 # 如果没有 tree 命令，使用 find 作为备选，并手动过滤
-#                 find_cmd = ['find', '.', '-maxdepth', str(max_depth)]
-#                 # 为每个排除目录添加 -not -path 条件
-#                 for exclude_dir in EXCLUDE_DIRECTORIES:
-#                     find_cmd.extend(['-not', '-path', f'*/{exclude_dir}/*'])
-#                     find_cmd.extend(['-not', '-name', exclude_dir])
-#                 find_cmd.extend(['-type', 'd'])
-#
-#                 tree_result = subprocess.run(find_cmd, capture_output=True, text=True, cwd=current_dir, timeout=10)
-#
-#         if tree_result.returncode == 0:
-#             raw_tree = tree_result.stdout.strip()
-#
-#             # 智能截断：如果输出过长，进行截断并添加提示
-#             if len(raw_tree) > MAX_TREE_LENGTH:
-#                 # 按行分割，保留前面的行
-#                 lines = raw_tree.split('\n')
-#                 truncated_lines = []
-#                 current_length = 0
-#
-#                 for line in lines:
-#                     if current_length + len(line) + 1 > MAX_TREE_LENGTH - 100:  # 预留空间给提示信息
-#                         break
-#                     truncated_lines.append(line)
-#                     current_length += len(line) + 1
-#
-#                 directory_tree = '\n'.join(truncated_lines)
-#                 directory_tree += f"\n\n... (目录结构过大，已截断显示前 {len(truncated_lines)} 行)"
-#                 directory_tree += f"\n💡 提示: 当前在 {current_dir}，建议在具体项目目录中执行以获得更详细的结构信息"
-#             else:
-#                 directory_tree = raw_tree
-#         else:
-#             directory_tree = "无法获取目录结构"
-#     except subprocess.TimeoutExpired:
-#         directory_tree = "目录结构获取超时（目录过大）"
-#     except Exception:
-#         directory_tree = "无法获取目录结构"
-#
-#     return directory_tree
-
-# !/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-目录树工具 - 智能获取当前目录结构
-"""
+from utils.directory_config import EXCLUDE_NAMES
 
-import os
-import platform
-import subprocess
-from pathlib import Path
-from utils.directory_config import EXCLUDE_DIRECTORIES
+# 允许显示的隐藏目录（其余以 . 开头的条目不显示）
+ALLOWED_HIDDEN_DIRS = {'.bmad', '.qoze', '.cursor'}
 
+# 最近一次结果：(current_dir, {已读取目录: mtime_ns}, 目录树文本)
+# 增删条目会更新所在目录的 mtime，只要读取过的目录 mtime 都未变，输出就不会变
+_tree_cache = None
 
-def _generate_tree_structure(directory, max_depth=4, current_depth=0, prefix=""):
-    """
-    纯 Python 实现的树状结构生成器
-    """
-    if current_depth >= max_depth:
-        return ""
 
+def _dir_mtime(path):
     try:
-        path = Path(directory)
-        # 获取所有项目并过滤排除目录
-        # all_items = [
-        #     item for item in path.iterdir()
-        #     if item.name not in EXCLUDE_DIRECTORIES and not item.name.startswith('.')
-        # ]
-        # 在文件顶部或配置中定义允许显示的隐藏目录
-        ALLOWED_HIDDEN_DIRS = {'.bmad','.qoze','.cursor'}  # 可以根据需要添加
-
-        # 修改过滤条件
-        all_items = [
-            item for item in path.iterdir()
-            if item.name not in EXCLUDE_DIRECTORIES and
-               (not item.name.startswith('.') or item.name in ALLOWED_HIDDEN_DIRS)
-        ]
-
-        # 分离目录和文件，目录优先显示
-        directories = sorted([item for item in all_items if item.is_dir()], key=lambda x: x.name.lower())
-        files = sorted([item for item in all_items if item.is_file()], key=lambda x: x.name.lower())
-
-        items = directories + files
-
-    except PermissionError:
-        return f"{prefix}[权限不足]\n"
-    except Exception:
-        return f"{prefix}[读取失败]\n"
-
-    result = ""
-    for i, item in enumerate(items):
-        is_last = i == len(items) - 1
-        current_prefix = "└── " if is_last else "├── "
-        next_prefix = prefix + ("    " if is_last else "│   ")
-
-        if item.is_dir():
-            result += f"{prefix}{current_prefix}{item.name}/\n"
-            # 递归处理子目录
-            result += _generate_tree_structure(item, max_depth, current_depth + 1, next_prefix)
-        else:
-            result += f"{prefix}{current_prefix}{item.name}\n"
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_directory(directory):
+    """读取单个目录，返回按名称排序的 (子目录, 文件) 两个 DirEntry 列表"""
+    directories = []
+    files = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            # EXCLUDE_NAMES 是集合，只做精确名匹配
+            if name in EXCLUDE_NAMES:
+                continue
+            if name.startswith('.') and name not in ALLOWED_HIDDEN_DIRS:
+                continue
+            if entry.is_dir():
+                directories.append(entry)
+            elif entry.is_file():
+                files.append(entry)
+
+    # 目录优先显示
+    directories.sort(key=lambda e: e.name.lower())
+    files.sort(key=lambda e: e.name.lower())
+    return directories, files
+
+
+def _generate_tree_structure(directory, max_depth=4, scanned=None):
+    """
+    纯 Python 实现的树状结构生成器，逐行产出（不含换行符）
 
-    return result
+    使用 os.scandir 一次读取目录项：DirEntry 自带类型信息，
+    区分目录/文件无需再对每个条目单独 stat。
+    以显式栈做深度优先遍历，栈中元素为待输出的行 (str) 或待展开的目录 (path, prefix, depth)；
+    按需产出使调用方在输出达到长度上限后即可停止遍历剩余目录。
+    传入 scanned 字典时记录每个实际读取的目录及其读取前的 mtime，供缓存校验。
+    """
+    stack = [(directory, "", 0)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+
+        path, prefix, depth = item
+        if depth >= max_depth:
+            continue
+        if scanned is not None:
+            scanned[path] = _dir_mtime(path)
+        try:
+            directories, files = _scan_directory(path)
+        except PermissionError:
+            yield f"{prefix}[权限不足]"
+            continue
+        except Exception:
+            yield f"{prefix}[读取失败]"
+            continue
+
+        children = []
+        last_index = len(directories) + len(files) - 1
+        for i, entry in enumerate(directories):
+            is_last = i == last_index
+            current_prefix = "└── " if is_last else "├── "
+            children.append(f"{prefix}{current_prefix}{entry.name}/")
+            children.append((entry.path, prefix + ("    " if is_last else "│   "), depth + 1))
+        for i, entry in enumerate(files, start=len(directories)):
+            current_prefix = "└── " if i == last_index else "├── "
+            children.append(f"{prefix}{current_prefix}{entry.name}")
+        # 逆序入栈，出栈顺序即输出顺序
+        children.reverse()
+        stack.extend(children)
 
 
 def get_directory_tree(current_dir=None):
     """
     获取当前目录树结构（智能限制深度和长度）
+
+    每次 LLM 调用都会请求目录树；上次读取过的目录均未变化时直接返回缓存结果，只需逐个 stat。
     """
+    global _tree_cache
     if current_dir is None:
         current_dir = os.getcwd()
 
+    cached = _tree_cache
+    if cached is not None and cached[0] == current_dir and all(
+            _dir_mtime(path) == mtime for path, mtime in cached[1].items()):
+        return cached[2]
+
+    scanned = {}
+    directory_tree = _build_directory_tree(current_dir, scanned)
+    if scanned:
+        _tree_cache = (current_dir, scanned, directory_tree)
+    return directory_tree
+
+
+def _build_directory_tree(current_dir, scanned):
     try:
         # 智能判断目录深度
-        path_depth = len(current_dir.split(os.sep))
+        path_depth = current_dir.count(os.sep) + 1
         if path_depth <= 3:
             max_depth = 2
         elif path_depth <= 5:
@@ -171,26 +125,20 @@ def get_directory_tree(current_dir=None):
             max_depth = 4
 
         MAX_TREE_LENGTH = 5000
-        # 使用 Python 实现
-        directory_tree = f"{os.path.basename(current_dir) or 'Root'}/\n"
-        directory_tree += _generate_tree_structure(current_dir, max_depth)  # 传递允许的隐藏目录
-        # print(f"directory_tree:{directory_tree}")
-        # 截断过长输出
-        if len(directory_tree) > MAX_TREE_LENGTH:
-            lines = directory_tree.split('\n')
-            truncated_lines = []
-            current_length = 0
-
-            for line in lines:
-                if current_length + len(line) + 1 > MAX_TREE_LENGTH - 100:
-                    break
-                truncated_lines.append(line)
-                current_length += len(line) + 1
-
-            directory_tree = '\n'.join(truncated_lines)
-            directory_tree += f"\n... (已截断，当前目录: {current_dir})"
-
-        return directory_tree
+        lines = [f"{os.path.basename(current_dir) or 'Root'}/"]
+        length = len(lines[0]) + 1
+        # 截断时保留的行数：累计长度首次超过 MAX_TREE_LENGTH - 100 之前的行
+        keep = None
+        for line in _generate_tree_structure(current_dir, max_depth, scanned):
+            lines.append(line)
+            length += len(line) + 1
+            if keep is None and length > MAX_TREE_LENGTH - 100:
+                keep = len(lines) - 1
+            if length > MAX_TREE_LENGTH:
+                # 已确定需要截断，不再遍历剩余目录
+                return '\n'.join(lines[:keep]) + f"\n... (已截断，当前目录: {current_dir})"
+
+        return '\n'.join(lines) + '\n'
 
     except Exception as e:
         return f"{os.path.basename(current_dir) or 'Root'}/\n└── 无法获取目录结构: {str(e)}"
@@ -7,78 +7,11 @@
 import os
 import glob
 import shutil
+import functools
 import subprocess
 
-
-def load_memory_context(memory_dir: str = ".qoze/memory", max_files: int = 5, max_total_chars: int = 8000) -> str:
-    """
-    加载 .qoze/memory/ 目录下的 checkpoint 文件，注入到动态上下文中。
-
-    当用户清理会话后重新开始，这些 checkpoint 文件帮助 Agent 快速恢复之前的任务上下文。
-
-    Args:
-        memory_dir: checkpoint 文件目录
-        max_files: 最多加载的文件数
-        max_total_chars: 总字符数上限，防止 token 超限
-
-    Returns:
-        str: 格式化的 memory 上下文，如果无文件则返回空字符串
-    """
-    import os
-    import glob
-
-    if not os.path.isdir(memory_dir):
-        return ""
-
-    files = sorted(
-        glob.glob(os.path.join(memory_dir, "checkpoint-*.md")),
-        key=os.path.getmtime,
-        reverse=True
-    )
-    if not files:
-        return ""
-
-    memory_text = "## 🧠 会话记忆 (Checkpoint 恢复)\n"
-    memory_text += "以下是从之前会话保存的 checkpoint 摘要，请基于这些记忆继续之前的工作。\n\n"
-
-    total_chars = 0
-    loaded = 0
-    for f in files[:max_files]:
-        try:
-            with open(f, 'r', encoding='utf-8') as fh:
-                file_content = fh.read()
-        except Exception:
-            continue
-
-        fname = os.path.basename(f)
-        # 截断过长文件
-        if total_chars + len(file_content) > max_total_chars:
-            remaining = max_total_chars - total_chars
-            if remaining > 500:
-                file_content = file_content[:remaining] + "\n\n[... 内容过长，已截断 ...]"
-            else:
-                break
-
-        memory_text += f"---\n### 📄 {fname}\n\n{file_content}\n\n"
-        total_chars += len(file_content)
-        loaded += 1
-
-    if loaded == 0:
-        return ""
-
-    return memory_text
-
-
-def get_static_system_prompt():
-    """
-    获取静态系统提示词（可被 OpenAI Prompt Caching 缓存的部分）
-    
-    这部分内容在每次请求中保持不变，放在 SystemMessage 中以最大化缓存命中率。
-    
-    Returns:
-        str: 静态系统提示词
-    """
-    return '''你是一名专业的终端AI agent 助手，你当前正运行在当前电脑的终端中:
+# 主 Agent 的静态系统提示词：模块级常量，每次调用返回同一个字符串对象
+_STATIC_SYSTEM_PROMPT = '''你是一名专业的终端AI agent 助手，你当前正运行在当前电脑的终端中:
 - 你当前可能处在某个项目文件夹内，需要协助我开发维护当前项目
 - 当你需要在我当前电脑安装新的库，组件，或者环境依赖的时候一定要经过我的同意才能执行
 - 作为编码为主的 AI agent，优先以高效、可验证的方式完成编程任务
@@ -240,19 +173,8 @@ activate_mcp_server("chrome-devtools")
 - **浏览器窗口**：Chrome MCP 会启动可见的 Chrome 窗口，请勿手动关闭它
 '''
 
-
-def get_subagent_system_prompt():
-    """
-    获取 Subagent 专用系统提示词。
-
-    Subagent 的工具集与主 Agent 不同：
-    - 有: tavily_search, read_url, read_lark_document, read_file, execute_command,
-          list_files, list_dir, find_files, grep_file, search_in_files, multiply, add, divide
-    - 无: 浏览器工具、技能工具、dispatch_subagent
-
-    所以需要独立的 system prompt，不包含这些不可用工具的说明。
-    """
-    return """你是主 Agent 派发的**子代理 (Subagent)**，运行在独立的上下文中完成单一任务。
+# Subagent 专用系统提示词
+_SUBAGENT_SYSTEM_PROMPT = """你是主 Agent 派发的**子代理 (Subagent)**，运行在独立的上下文中完成单一任务。
 你接收一个明确的 Task 描述，必须在完成后返回结果。
 
 ## 可用工具
@@ -311,6 +233,200 @@ def get_subagent_system_prompt():
   4. 确认无误后返回。如有问题，修正后再返回。
 """
 
+# 动态上下文开头的环境信息，只有少量字段随调用变化
+_ENV_TEMPLATE = """## 系统环境信息
+**操作系统**: {system_info} {system_release} ({system_version})
+**架构**: {machine_type}
+**处理器**: {processor}
+**Shell**: {shell}
+**python环境**: 基本python，需要的像excel等工具库都已经安装
+
+## 当前环境
+**工作目录**: {current_dir}
+
+## 当前项目目录
+{directory_tree}
+"""
+
+# load_qoze_rules 的最近一次结果：(rules_dir, 规则文件指纹, 规则文本)
+_rules_cache = None
+
+
+@functools.lru_cache(maxsize=4)
+def _rules_dir_for(current_dir: str) -> str:
+    # 工作目录在会话中很少变化，拼接结果直接复用
+    return os.path.join(current_dir, '.qoze', 'rules')
+
+
+@functools.lru_cache(maxsize=4)
+def _list_rule_files(rules_dir: str, dir_mtime_ns: int) -> tuple:
+    """列出规则目录中的普通文件名（按文件名排序）
+
+    增删、重命名文件都会更新目录 mtime，以其为参数使缓存自动失效；目录未变时无需重新 scandir 和排序。
+    """
+    # DirEntry 自带类型信息，过滤子目录等非普通文件无需单独 stat
+    with os.scandir(rules_dir) as it:
+        names = [entry.name for entry in it if entry.is_file()]
+    names.sort()
+    return tuple(names)
+
+
+def _read_rule_file(path: str, size: int) -> str:
+    """按扫描时得到的文件大小直接 os.read 读取，规则文件通常很小，一次读取即可"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # 多读 1 字节：读满说明文件在扫描后变大了，继续读完剩余部分
+        data = os.read(fd, size + 1)
+        if len(data) > size:
+            chunks = [data]
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    # 与文本模式 open() 读取一致：UTF-8 解码并统一换行符
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def load_qoze_rules(current_dir: str) -> str:
+    """
+    加载 .qoze/rules 目录下的自定义规则文件
+
+    每轮对话都会调用；规则文件的 (名称, mtime, 大小) 均未变化时直接返回缓存文本，不再重新读取文件内容。
+
+    Args:
+        current_dir: 当前工作目录
+
+    Returns:
+        str: 格式化的规则内容，如果没有规则则返回空字符串
+    """
+    global _rules_cache
+    rules_dir = _rules_dir_for(current_dir)
+    # 大多数目录没有规则目录：一次 stat 即可提前返回，同时拿到目录 mtime 供文件列表缓存使用
+    try:
+        dir_mtime_ns = os.stat(rules_dir).st_mtime_ns
+    except OSError:
+        return ''
+
+    try:
+        rule_files = []
+        for file_name in _list_rule_files(rules_dir, dir_mtime_ns):
+            try:
+                st = os.stat(os.path.join(rules_dir, file_name))
+            except OSError:
+                continue
+            rule_files.append((file_name, st.st_mtime_ns, st.st_size))
+    except Exception:
+        return ''  # 静默处理目录读取错误
+
+    fingerprint = tuple(rule_files)
+    cached = _rules_cache
+    if cached is not None and cached[0] == rules_dir and cached[1] == fingerprint:
+        return cached[2]
+
+    rules_prompt = ''
+    if rule_files:
+        parts = ["## 当前自定义 agent 规则\n"]
+        for file_name, _, size in rule_files:
+            file_path = os.path.join(rules_dir, file_name)
+            try:
+                file_content = _read_rule_file(file_path, size)
+                parts.append(f"### {file_name}\n{file_content}\n")
+            except Exception:
+                pass  # 静默处理单个文件读取错误
+        parts.append("\n")
+        rules_prompt = "".join(parts)
+
+    _rules_cache = (rules_dir, fingerprint, rules_prompt)
+    return rules_prompt
+
+
+def load_memory_context(memory_dir: str = ".qoze/memory", max_files: int = 5, max_total_chars: int = 8000) -> str:
+    """
+    加载 .qoze/memory/ 目录下的 checkpoint 文件，注入到动态上下文中。
+
+    当用户清理会话后重新开始，这些 checkpoint 文件帮助 Agent 快速恢复之前的任务上下文。
+
+    Args:
+        memory_dir: checkpoint 文件目录
+        max_files: 最多加载的文件数
+        max_total_chars: 总字符数上限，防止 token 超限
+
+    Returns:
+        str: 格式化的 memory 上下文，如果无文件则返回空字符串
+    """
+    if not os.path.isdir(memory_dir):
+        return ""
+
+    files = sorted(
+        glob.glob(os.path.join(memory_dir, "checkpoint-*.md")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    if not files:
+        return ""
+
+    parts = [
+        "## 🧠 会话记忆 (Checkpoint 恢复)\n",
+        "以下是从之前会话保存的 checkpoint 摘要，请基于这些记忆继续之前的工作。\n\n",
+    ]
+
+    total_chars = 0
+    loaded = 0
+    for f in files[:max_files]:
+        try:
+            with open(f, 'r', encoding='utf-8') as fh:
+                file_content = fh.read()
+        except Exception:
+            continue
+
+        fname = os.path.basename(f)
+        # 截断过长文件
+        if total_chars + len(file_content) > max_total_chars:
+            remaining = max_total_chars - total_chars
+            if remaining > 500:
+                file_content = file_content[:remaining] + "\n\n[... 内容过长，已截断 ...]"
+            else:
+                break
+
+        parts.append(f"---\n### 📄 {fname}\n\n{file_content}\n\n")
+        total_chars += len(file_content)
+        loaded += 1
+
+    if loaded == 0:
+        return ""
+
+    return "".join(parts)
+
+
+def get_static_system_prompt():
+    """
+    获取静态系统提示词（可被 OpenAI Prompt Caching 缓存的部分）
+    
+    这部分内容在每次请求中保持不变，放在 SystemMessage 中以最大化缓存命中率。
+    
+    Returns:
+        str: 静态系统提示词
+    """
+    return _STATIC_SYSTEM_PROMPT
+
+
+def get_subagent_system_prompt():
+    """
+    获取 Subagent 专用系统提示词。
+
+    Subagent 的工具集与主 Agent 不同：
+    - 有: tavily_search, read_url, read_lark_document, read_file, execute_command,
+          list_files, list_dir, find_files, grep_file, search_in_files, multiply, add, divide
+    - 无: 浏览器工具、技能工具、dispatch_subagent
+
+    所以需要独立的 system prompt，不包含这些不可用工具的说明。
+    """
+    return _SUBAGENT_SYSTEM_PROMPT
+
 
 def get_dynamic_context(system_info, system_release, system_version, machine_type,
                         processor, shell, current_dir, directory_tree, rules_prompt="",
@@ -341,27 +457,21 @@ def get_dynamic_context(system_info, system_release, system_version, machine_typ
     Returns:
         str: 格式化的动态上下文
     """
-    context = f"""## 系统环境信息
-**操作系统**: {system_info} {system_release} ({system_version})
-**架构**: {machine_type}
-**处理器**: {processor}
-**Shell**: {shell}
-**python环境**: 基本python，需要的像excel等工具库都已经安装
-
-## 当前环境
-**工作目录**: {current_dir}
-
-## 当前项目目录
-{directory_tree}
+    parts = [_ENV_TEMPLATE.format(
+        system_info=system_info, system_release=system_release, system_version=system_version,
+        machine_type=machine_type, processor=processor, shell=shell,
+        current_dir=current_dir, directory_tree=directory_tree,
+    )]
 
     # 添加 Git 上下文（自动提取，无需 Agent 执行 git status）
+    # 紧跟在环境信息之后、前后各一个换行；git_context 为空时不输出任何内容。
+    # 原实现把这段代码误写在 f-string 内，输出中总是带着这几行字面代码（git 信息嵌在其中），现已修正
     if git_context:
-        context += f"\n{git_context}\n"
-"""
+        parts.append(f"\n{git_context}\n")
 
     # 添加自定义规则
     if rules_prompt:
-        context += f"\n{rules_prompt}\n"
+        parts.append(f"\n{rules_prompt}\n")
 
     # 添加可用技能
     if available_skills:
@@ -369,22 +479,36 @@ def get_dynamic_context(system_info, system_release, system_version, machine_typ
         skills_summary = "\n".join(
             f"- **{name}**: {desc}" for name, desc in available_skills.items()
         )
-        context += f"\n## 🎯 Available Skills System ({len(available_skills)} 个)\n{skills_summary}\n"
+        parts.append(f"\n## 🎯 Available Skills System ({len(available_skills)} 个)\n{skills_summary}\n")
 
     # 添加激活的技能
     if active_skills_content:
-        context += f"\n## 🔥 Currently Active Skills:\n{active_skills_content}\n"
+        parts.append(f"\n## 🔥 Currently Active Skills:\n{active_skills_content}\n")
 
     # 添加会话记忆 (checkpoint 恢复)
     if memory_prompt:
-        context += f"\n{memory_prompt}\n"
+        parts.append(f"\n{memory_prompt}\n")
 
     # 添加模型视觉支持信息
     if model_name:
         if model_supports_vision:
-            context += f"\n## 视觉模态: 当前模型 {model_name} **支持**图片输入，.qoze/image/ 目录下的图片会自动加载到上下文。\n"
+            parts.append(f"\n## 视觉模态: 当前模型 {model_name} **支持**图片输入，.qoze/image/ 目录下的图片会自动加载到上下文。\n")
         else:
-            context += f"\n## 视觉模态: 当前模型 {model_name} **不支持**图片输入，.qoze/image/ 目录下的图片将不会被加载。如果需要处理图片，请切换到支持多模态的模型（如 GPT-5、Gemini、GLM-5V-Turbo、Qwen3 等）。\n"
+            parts.append(f"\n## 视觉模态: 当前模型 {model_name} **不支持**图片输入，.qoze/image/ 目录下的图片将不会被加载。如果需要处理图片，请切换到支持多模态的模型（如 GPT-5、Gemini、GLM-5V-Turbo、Qwen3 等）。\n")
+
+    # 本机工具检测（lark-cli / rg / ffmpeg）
+    parts.append(_get_env_tools_context())
+
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_env_tools_context() -> str:
+    """检测本机已安装的命令行工具
+
+    结果在进程内缓存：检测 ffmpeg 版本需要启动子进程，而动态上下文每轮对话都会重建。
+    """
+    context = ""
 
     # 检测 lark-cli 是否安装，若已安装则提示 Agent 可以使用飞书工具
     if shutil.which("lark-cli"):